@@ -1,15 +1,23 @@
 import binascii
+import json
+import logging
 import os
 from datetime import timedelta
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Union
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User as UserType  # For type annotations
+from django.core.cache import cache
 from django.utils import timezone
+from django_redis import get_redis_connection
 
 from .apikey_models import APIKey
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Channel the FastAPI workers subscribe to for dropping cached auth results
+REVOCATION_CHANNEL = "auth:revoked"
 
 
 def generate_unique_key() -> str:
@@ -36,10 +44,21 @@ def revoke_api_key(api_key_id: Union[int, str], user: UserType) -> bool:
             return False
         api_key.revoked = True
         api_key.save()
+        cache.delete(f"api_key_valid_{api_key.hashed_key}")
+        publish_revocation({"hashed_key": api_key.hashed_key})
         return True
     except APIKey.DoesNotExist:
         return False
 
 
+def publish_revocation(payload: Dict[str, Any]) -> None:
+    """Notify the FastAPI workers so they evict the revoked credential"""
+    try:
+        get_redis_connection("default").publish(REVOCATION_CHANNEL, json.dumps(payload))
+    except Exception as e:
+        # Workers still expire the entry after AUTH_CACHE_TTL
+        logger.warning(f"Failed to publish revocation: {e}")
+
+
 def get_user_api_keys(user: UserType):
     return APIKey.objects.filter(owner=user, revoked=False)
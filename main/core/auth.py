@@ -1,54 +1,30 @@
+import asyncio
+import hashlib
+import json
 import logging
 import os
 import sys
-from typing import Awaitable, Callable, Optional, TypedDict, cast
+import time
+from typing import Any, Awaitable, Callable, Optional, TypedDict, cast
 
-import django
 from asgiref.sync import sync_to_async
 from fastapi import Header, HTTPException
+from jose import JWTError, jwt
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# Configure environment variables first
-os.environ["DJANGO_SECRET_KEY"] = "Pxf0AsnFeejnpZfp4Ya8F4wsyJcqSV2Q"
-os.environ["DJANGO_SETTINGS_MODULE"] = "auth_project.settings"
-os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
-
-# Configure Django environment
-project_root = "/app"  # Container root directory
-django_auth_path = os.path.join(project_root, "django_auth")
-
-# Configure Python paths for import resolution
-local_auth_path = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), "django_auth"
-)
-container_auth_path = django_auth_path
+from core.jwt_verifier import user_directory, verify_access_token
+from core.metrics import CACHE_LOOKUPS
+from core.ttl_cache import TTLCache
 
-# Add both local and container paths for IDE and runtime resolution
-for path in [local_auth_path, container_auth_path]:
-    if path not in sys.path:
-        sys.path.insert(0, path)
-        sys.path.insert(0, os.path.dirname(path))
-
-logger.info("Python paths configured:")
-logger.info(f"Local auth path: {local_auth_path}")
-logger.info(f"Container auth path: {container_auth_path}")
-logger.info(f"sys.path: {sys.path}")
-
-# Configure remaining environment variables
-os.environ.setdefault("POSTGRES_DB", "besb_db")
-os.environ.setdefault("POSTGRES_USER", "besb_user")
-os.environ.setdefault("POSTGRES_PASSWORD", "NsJTxYB5VY7hTN3EAulY1Ice132qKhgH")
-os.environ.setdefault("POSTGRES_CONTAINER_NAME", "besb_postgres")
-os.environ.setdefault("REDIS_CONTAINER_NAME", "besb_redis")
+logger = logging.getLogger(__name__)
 
-# Initialize Django
-django.setup()
+# The Django project sits next to main/ in the repo (and at /app/django_auth
+# in the container, which is the same place)
+DJANGO_AUTH_PATHS = [
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "django_auth"
+    ),
+    "/app/django_auth",
+]
 
 
 # Define TypedDict for auth results
@@ -60,34 +36,140 @@ class AuthResult(TypedDict, total=False):
     username: Optional[str]
 
 
-# Import authentication services
-logger.info("Attempting to import authentication services...")
-try:
-    from authentication import services  # type: ignore
+AuthLogic = Callable[[str], Awaitable[AuthResult]]
+
+# Set by init_auth()
+_verify_api_key_logic: Optional[AuthLogic] = None
+_verify_token_logic: Optional[AuthLogic] = None
+
 
-    # Properly cast the imported functions to known types
+def init_auth() -> None:
+    """
+    Configure Django and load the authentication services. Called from the
+    lifespan hook at startup; the verify functions call it too in case nothing
+    did (scripts, tests). Safe to call more than once.
+    """
+    global _verify_api_key_logic, _verify_token_logic
+    if _verify_api_key_logic is not None:
+        return
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "auth_project.settings")
+    os.environ.setdefault("DJANGO_ALLOW_ASYNC_UNSAFE", "true")
+    # Django settings read these without fallbacks
+    os.environ.setdefault("POSTGRES_DB", "besb_db")
+    os.environ.setdefault("POSTGRES_USER", "besb_user")
+    os.environ.setdefault("POSTGRES_PASSWORD", "NsJTxYB5VY7hTN3EAulY1Ice132qKhgH")
+    os.environ.setdefault("POSTGRES_CONTAINER_NAME", "besb_postgres")
+    os.environ.setdefault("REDIS_CONTAINER_NAME", "besb_redis")
+    for path in DJANGO_AUTH_PATHS:
+        if os.path.isdir(path) and path not in sys.path:
+            sys.path.insert(0, path)
+            break
+
+    try:
+        import django
+
+        django.setup()
+        from authentication import services  # type: ignore
+    except ImportError as e:
+        logger.error(f"Failed to import authentication services: {e}")
+        raise ImportError(f"Could not import authentication services: {e}")
+
+    _verify_token_logic = cast(AuthLogic, sync_to_async(services.verify_token_logic))
     _verify_api_key_logic = cast(
-        Callable[[str], AuthResult],
-        services.verify_api_key_logic,  # type: ignore[assignment]
-    )
-    _verify_token_logic = cast(
-        Callable[[str], AuthResult],
-        services.verify_token_logic,  # type: ignore[assignment]
+        AuthLogic, sync_to_async(services.verify_api_key_logic)
     )
 
-    # Create properly typed async wrappers
-    verify_api_key_logic = cast(
-        Callable[[str], Awaitable[AuthResult]], sync_to_async(_verify_api_key_logic)
-    )
-    verify_token_logic = cast(
-        Callable[[str], Awaitable[AuthResult]], sync_to_async(_verify_token_logic)
+
+async def verify_api_key_logic(api_key: str) -> AuthResult:
+    init_auth()
+    assert _verify_api_key_logic is not None
+    return await _verify_api_key_logic(api_key)
+
+
+async def verify_token_logic(token: str) -> AuthResult:
+    init_auth()
+    assert _verify_token_logic is not None
+    return await _verify_token_logic(token)
+
+
+# In-process L1 cache for successful verifications, keyed by credential hash.
+# Entries live for at most AUTH_CACHE_TTL seconds (and never past a token's
+# exp), so a revocation is seen within that window even without a pub/sub
+# message from the Django side.
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+AUTH_CACHE_MAXSIZE = int(os.getenv("AUTH_CACHE_MAXSIZE", "10000"))
+REVOCATION_CHANNEL = "auth:revoked"
+
+# Verify Bearer tokens on the event loop instead of through Django
+AUTH_NATIVE_JWT = os.getenv("AUTH_NATIVE_JWT", "true").lower() == "true"
+
+auth_cache: TTLCache[AuthResult] = TTLCache(
+    maxsize=AUTH_CACHE_MAXSIZE, ttl=AUTH_CACHE_TTL
+)
+
+
+def auth_ready() -> bool:
+    """Whether tokens and API keys can be verified without further setup"""
+    if _verify_api_key_logic is None:
+        return False
+    return user_directory.loaded if AUTH_NATIVE_JWT else True
+
+
+def _hash_credential(credential: str) -> str:
+    return hashlib.sha256(credential.encode()).hexdigest()
+
+
+def _token_ttl(token: str) -> Optional[float]:
+    """Seconds until the token's exp claim, read without verifying it"""
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        return None
+    return None if exp is None else float(exp) - time.time()
+
+
+def revoke_api_key(hashed_key: str) -> bool:
+    """Drop a cached API key, identified by its SHA-256 hash"""
+    return auth_cache.invalidate(f"apikey:{hashed_key}")
+
+
+def revoke_user(user_id: int) -> int:
+    """Drop every cached token or API key belonging to a user"""
+    return auth_cache.invalidate_where(
+        lambda _, result: user_id
+        in (result.get("user_id"), cast(Any, result).get("owner_id"))
     )
 
-    logger.info("Successfully imported authentication services")
-except ImportError as e:
-    logger.error(f"Failed to import authentication services: {e}")
-    logger.error(f"sys.path: {sys.path}")
-    raise ImportError(f"Could not import authentication services: {e}")
+
+async def listen_for_revocations(redis: Any) -> None:
+    """
+    Apply revocations published by the Django auth service to this worker's
+    cache. Messages are JSON objects with a `hashed_key` and/or `user_id`.
+    """
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(REVOCATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                except ValueError:
+                    logger.warning(f"Ignoring malformed revocation: {message}")
+                    continue
+                if payload.get("hashed_key"):
+                    revoke_api_key(str(payload["hashed_key"]))
+                if payload.get("user_id") is not None:
+                    revoke_user(int(payload["user_id"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Revocation listener error, resubscribing: {e}")
+            await asyncio.sleep(5)
+        finally:
+            await pubsub.aclose()
 
 
 async def verify_api_key(authorization: str = Header(None)) -> AuthResult:
@@ -98,6 +180,12 @@ async def verify_api_key(authorization: str = Header(None)) -> AuthResult:
         raise HTTPException(status_code=401, detail="Invalid API key format")
 
     api_key = authorization.split(" ")[1]
+    cache_key = f"apikey:{_hash_credential(api_key)}"
+    cached = auth_cache.get(cache_key)
+    CACHE_LOOKUPS.labels("auth", "miss" if cached is None else "hit").inc()
+    if cached is not None:
+        return cast(AuthResult, dict(cached))
+
     try:
         result = await verify_api_key_logic(api_key)
         if not result.get("valid", False):
@@ -105,7 +193,10 @@ async def verify_api_key(authorization: str = Header(None)) -> AuthResult:
                 status_code=401,
                 detail=f"Invalid API key: {result.get('error', 'Unknown error')}",
             )
+        auth_cache.set(cache_key, cast(AuthResult, dict(result)))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=503, detail=f"Authentication service error: {str(e)}"
@@ -124,8 +215,18 @@ async def verify_token(authorization: str = Header(None)) -> AuthResult:
 
     if auth_type == "bearer":
         token = auth_parts[1]
+        cache_key = f"token:{_hash_credential(token)}"
+        cached = auth_cache.get(cache_key)
+        CACHE_LOOKUPS.labels("auth", "miss" if cached is None else "hit").inc()
+        if cached is not None:
+            return cast(AuthResult, dict(cached))
+
         try:
-            result = await verify_token_logic(token)
+            if AUTH_NATIVE_JWT:
+                init_auth()  # JWT settings come from the Django config
+                result = cast(AuthResult, await verify_access_token(token))
+            else:
+                result = await verify_token_logic(token)
             if not result.get("valid", False):
                 raise HTTPException(
                     status_code=401,
@@ -133,7 +234,10 @@ async def verify_token(authorization: str = Header(None)) -> AuthResult:
                 )
             # For Bearer tokens, we grant full permissions
             result["permission"] = "read_write"
+            auth_cache.set(cache_key, cast(AuthResult, dict(result)), _token_ttl(token))
             return result
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=503, detail=f"Authentication service error: {str(e)}"
@@ -0,0 +1,77 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+
+# Same window as the ex_*_dedup exclusion constraints on the absen tables
+DUPLICATE_WINDOW = timedelta(hours=2)
+MAX_BULK_ROWS = int(os.getenv("MAX_BULK_ROWS", "1000"))
+
+
+async def read_bulk_rows(request: Request) -> List[Any]:
+    """Parse a JSON array or NDJSON (one object per line) request body"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+
+    try:
+        if "ndjson" in content_type:
+            rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            rows = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON format")
+
+    if not isinstance(rows, list):
+        raise HTTPException(
+            status_code=400, detail="Expected a JSON array or NDJSON of rows"
+        )
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many rows: {len(rows)} (maximum {MAX_BULK_ROWS})",
+        )
+    return rows
+
+
+def combine_tanggal(tanggal: str, jam_hadir: str) -> datetime:
+    """Combine a YYYY-MM-DD date and HH:MM time; raises ValueError if invalid"""
+    tanggal_dt = datetime.strptime(tanggal, "%Y-%m-%d")
+    return datetime.combine(
+        tanggal_dt.date(), datetime.strptime(jam_hadir, "%H:%M").time()
+    )
+
+
+def describe_row_error(error: ValueError) -> str:
+    """Short, per-field description of why a row was rejected"""
+    if isinstance(error, ValidationError):
+        messages = []
+        for err in error.errors():
+            field = ".".join(str(part) for part in err["loc"])
+            messages.append(f"{field}: {err['msg']}" if field else err["msg"])
+        return "; ".join(messages)
+    return str(error)
+
+
+def split_batch_duplicates(
+    rows: Sequence[Dict[str, Any]], key_fields: Sequence[str]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Walk rows in input order and drop any that fall within DUPLICATE_WINDOW of
+    an earlier kept row with the same key. Returns (kept, duplicates).
+    """
+    accepted: Dict[Tuple[Any, ...], List[datetime]] = {}
+    kept: List[Dict[str, Any]] = []
+    duplicates: List[Dict[str, Any]] = []
+
+    for row in rows:
+        times = accepted.setdefault(tuple(row[field] for field in key_fields), [])
+        if any(abs(row["tanggal"] - seen) <= DUPLICATE_WINDOW for seen in times):
+            duplicates.append(row)
+        else:
+            times.append(row["tanggal"])
+            kept.append(row)
+
+    return kept, duplicates
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+# Clients reuse a payload this long, then revalidate it with If-None-Match
+CACHE_CONTROL = os.getenv("REFERENCE_CACHE_CONTROL", "public, max-age=300")
+
+
+@dataclass(frozen=True)
+class Payload:
+    """A JSON response serialized once, with a content-hash ETag"""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def of(cls, data: Any) -> "Payload":
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(body=body, etag=f'"{digest}"')
+
+    @classmethod
+    def compose(cls, parts: Dict[str, "Payload"]) -> "Payload":
+        """JSON object of existing payloads, spliced without re-serializing"""
+        body = (
+            b"{"
+            + b",".join(
+                json.dumps(key).encode() + b":" + part.body
+                for key, part in parts.items()
+            )
+            + b"}"
+        )
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(body=body, etag=f'"{digest}"')
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header, as RFC 9110 asks"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_response(
+    request: Request, payload: Payload, cache_control: str = CACHE_CONTROL
+) -> Response:
+    """304 when the client already has this payload, otherwise the stored body"""
+    headers = {"ETag": payload.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=payload.body, media_type="application/json", headers=headers
+    )
@@ -1,11 +1,22 @@
+import asyncio
 import logging
 import os
-from contextlib import contextmanager
-from typing import AsyncGenerator, Generator
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Set
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.pool import QueuePool
-from sqlmodel import Session, SQLModel, create_engine  # type: ignore
+from sqlalchemy.util import await_only
+from sqlmodel import Session, create_engine  # type: ignore
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 # Configure logging
@@ -29,6 +40,92 @@ MAX_OVERFLOW = int(os.getenv("MAX_OVERFLOW", "10"))
 POOL_TIMEOUT = int(os.getenv("POOL_TIMEOUT", "30"))
 POOL_RECYCLE = int(os.getenv("POOL_RECYCLE", "1800"))  # 30 minutes
 CONNECT_TIMEOUT = int(os.getenv("CONNECT_TIMEOUT", "10"))  # 10 seconds
+# Attempts per new connection, with exponential backoff from CONNECT_RETRY_WAIT
+CONNECT_RETRIES = int(os.getenv("CONNECT_RETRIES", "3"))
+CONNECT_RETRY_WAIT = float(os.getenv("CONNECT_RETRY_WAIT", "0.5"))
+
+# Prepared statements kept per asyncpg connection. Each distinct SQL string
+# (a multi-row insert of a new size, an IN list of a new length) takes a slot,
+# so with the default of 100 they push out the hot single-row lookups.
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+# Compiled SQL kept per engine by SQLAlchemy
+QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1000"))
+# Behind pgbouncer in transaction mode a session may use a different server
+# connection for each transaction, which breaks named prepared statements and
+# session settings. This turns both off; set the timeouts below on the role
+# or in pgbouncer instead.
+PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+# Server-side limits in milliseconds (0 disables)
+STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+IDLE_IN_TRANSACTION_TIMEOUT_MS = int(
+    os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", "60000")
+)
+
+# Optional read replicas: comma-separated URLs (postgresql:// or
+# postgresql+asyncpg://). Reads routed through core.replicas use them; with
+# none configured everything stays on the primary.
+REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("POSTGRES_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+
+# Schema changes only happen through Alembic. Workers compare the database's
+# revision with the migration heads at startup: "strict" refuses to start on a
+# mismatch, "warn" only logs it, "off" skips the check.
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "strict").lower()
+MIGRATIONS_DIR = os.getenv(
+    "MIGRATIONS_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "migrations"
+    ),
+)
+
+SERVER_SETTINGS = {
+    "statement_timeout": str(STATEMENT_TIMEOUT_MS),
+    "idle_in_transaction_session_timeout": str(IDLE_IN_TRANSACTION_TIMEOUT_MS),
+}
+
+
+def _asyncpg_connect_args() -> Dict[str, Any]:
+    args: Dict[str, Any] = {"timeout": CONNECT_TIMEOUT}
+    if PGBOUNCER_MODE:
+        # No statement reuse, and unique names for the unnamed ones asyncpg
+        # still prepares, so two clients never clash on one server connection
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        args["statement_cache_size"] = STATEMENT_CACHE_SIZE
+        args["prepared_statement_cache_size"] = STATEMENT_CACHE_SIZE
+        args["server_settings"] = SERVER_SETTINGS
+    return args
+
+
+def _psycopg2_connect_args() -> Dict[str, Any]:
+    args: Dict[str, Any] = {
+        "connect_timeout": CONNECT_TIMEOUT,
+        "application_name": "fastapi_app",  # Helps identify connections in pg_stat_activity
+    }
+    if not PGBOUNCER_MODE:
+        args["options"] = " ".join(
+            f"-c {name}={value}" for name, value in SERVER_SETTINGS.items()
+        )
+    return args
+
+
+def create_async_pool(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://", 1),
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+        query_cache_size=QUERY_CACHE_SIZE,
+        connect_args=_asyncpg_connect_args(),
+    )
+
 
 # Create engines with optimized configurations
 engine = create_engine(
@@ -39,20 +136,53 @@ engine = create_engine(
     pool_timeout=POOL_TIMEOUT,
     pool_recycle=POOL_RECYCLE,
     pool_pre_ping=True,
-    connect_args={
-        "connect_timeout": CONNECT_TIMEOUT,
-        "application_name": "fastapi_app",  # Helps identify connections in pg_stat_activity
-    },
+    query_cache_size=QUERY_CACHE_SIZE,
+    connect_args=_psycopg2_connect_args(),
 )
 
-async_engine = create_async_engine(
-    ASYNC_DATABASE_URL,
-    pool_size=POOL_SIZE,
-    max_overflow=MAX_OVERFLOW,
-    pool_timeout=POOL_TIMEOUT,
-    pool_recycle=POOL_RECYCLE,
-    pool_pre_ping=True,
-    connect_args={"timeout": CONNECT_TIMEOUT},
+async_engine = create_async_pool(ASYNC_DATABASE_URL)
+
+# No connect retries here: a replica that cannot be reached is ejected and
+# reads fall back to the others or the primary
+replica_engines = [create_async_pool(url) for url in REPLICA_URLS]
+
+# Sessions keep loaded attributes after commit, so handlers can build their
+# response from them without another round-trip
+async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+def _retrying_connect(sleep: Callable[[float], Any]) -> Callable[..., Any]:
+    """
+    do_connect hook retrying failed connection attempts. It runs when the pool
+    opens a connection, so only checkouts that need a new connection wait.
+    """
+
+    def do_connect(dialect: Any, conn_rec: Any, cargs: Any, cparams: Any) -> Any:
+        # Read by core.metrics to time the connect, retries included
+        conn_rec.info["connect_started"] = time.perf_counter()
+        for attempt in range(1, CONNECT_RETRIES + 1):
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except (dialect.loaded_dbapi.Error, OSError) as e:
+                if attempt == CONNECT_RETRIES:
+                    raise
+                wait = CONNECT_RETRY_WAIT * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Database connect failed (attempt {attempt}/{CONNECT_RETRIES}),"
+                    f" retrying in {wait:.1f}s: {e}"
+                )
+                sleep(wait)
+
+    return do_connect
+
+
+event.listen(engine, "do_connect", _retrying_connect(time.sleep))
+# The async dialect connects inside SQLAlchemy's greenlet, so sleep through
+# the event loop rather than blocking it
+event.listen(
+    async_engine.sync_engine,
+    "do_connect",
+    _retrying_connect(lambda seconds: await_only(asyncio.sleep(seconds))),
 )
 
 
@@ -99,44 +229,12 @@ def get_db_dependency() -> Generator[Session, None, None]:
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Asynchronous database session generator with retry mechanism.
+    Asynchronous database session dependency. Connection failures are retried
+    by the engine when the session first connects, not here: an exception
+    raised after the yield comes from the request handler and must propagate.
     """
-    # Create a session directly - we'll handle retries within this function
-    async_session = None
-    retry_count = 0
-    max_retries = 3
-
-    while retry_count < max_retries:
-        try:
-            # Try to create a session
-            async_session = AsyncSession(async_engine)
-            # If successful, yield the session and break out of retry loop
-            yield async_session
-            # After the yield returns (when the client is done with the session)
-            break
-        except Exception as e:
-            retry_count += 1
-            wait_time = min(2**retry_count, 10)  # Exponential backoff
-            logger.error(
-                f"Failed to create async database session (attempt {retry_count}/{max_retries}): {e}"
-            )
-
-            if retry_count >= max_retries:
-                logger.error("Maximum retry attempts reached. Raising exception.")
-                raise
-
-            # Wait before retrying
-            import asyncio
-
-            await asyncio.sleep(wait_time)
-
-    # Handle cleanup
-    if async_session is not None:
-        try:
-            # Session won't be None here since we only reach this point if session creation succeeded
-            await async_session.close()
-        except Exception as e:
-            logger.error(f"Error while closing async session: {e}")
+    async with async_session_factory() as session:
+        yield session
 
 
 # Helper function to check database health
@@ -149,8 +247,6 @@ async def check_database_health() -> bool:
 
     try:
         async with async_engine.connect() as conn:
-            from sqlalchemy import text
-
             await conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
@@ -158,14 +254,67 @@ async def check_database_health() -> bool:
         raise
 
 
-# Create all tables defined in SQLModel metadata
-def init_db():
+def _warm_sync_pool(size: int) -> None:
+    with ExitStack() as stack:
+        for _ in range(size):
+            stack.enter_context(engine.connect())
+
+
+async def _warm_async_pool(size: int) -> None:
+    connections = await asyncio.gather(
+        *(async_engine.connect().start() for _ in range(size)),
+        return_exceptions=True,
+    )
+    await asyncio.gather(
+        *(conn.close() for conn in connections if not isinstance(conn, BaseException))
+    )
+    for result in connections:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def warm_up_pools(size: int = POOL_SIZE) -> None:
     """
-    Initialize database tables with error handling.
+    Open `size` connections on both engines and hand them back to the pools,
+    so the first requests after startup do not pay for connection setup.
+    Connections are held together, otherwise the pool would reuse one.
     """
-    try:
-        SQLModel.metadata.create_all(engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Failed to create database tables: {e}")
-        raise
+    await asyncio.gather(
+        asyncio.to_thread(_warm_sync_pool, size), _warm_async_pool(size)
+    )
+
+
+def migration_heads() -> Set[str]:
+    """Revisions the code expects the database to be at"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory(MIGRATIONS_DIR).get_heads())
+
+
+async def check_schema_version() -> None:
+    """
+    Fail (or warn, see SCHEMA_CHECK) if alembic_version does not match the
+    migration heads, e.g. when a deploy skipped `alembic upgrade head`.
+    """
+    if SCHEMA_CHECK == "off":
+        return
+
+    async with async_engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = {row[0] for row in result}
+        except ProgrammingError:
+            current = set()
+
+    expected = migration_heads()
+    if current == expected:
+        return
+
+    message = (
+        f"Database schema is at {sorted(current) or 'no revision'}, "
+        f"code expects {sorted(expected)}; run `alembic upgrade head`"
+    )
+    if SCHEMA_CHECK == "warn":
+        logger.warning(message)
+        return
+    raise RuntimeError(message)
@@ -0,0 +1,169 @@
+import csv
+import io
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Type
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from core.replicas import prefers_primary, read_engine
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the server-side cursor per round-trip
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+# The cursor's transaction sits idle while a slow client catches up, so the
+# connection-wide DB_IDLE_IN_TRANSACTION_TIMEOUT_MS would end the export when
+# a client stalls for longer; exports get this limit instead (0 disables)
+EXPORT_IDLE_TIMEOUT_MS = int(os.getenv("EXPORT_IDLE_TIMEOUT_MS", "900000"))
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def format_value(value: Any) -> Any:
+    # Same format as the json_encoders on the Read schemas
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return value
+
+
+def date_range_filters(
+    column: Any, start_date: Optional[str], end_date: Optional[str]
+) -> List[Any]:
+    """Inclusive YYYY-MM-DD range on a timestamp column"""
+    filters: List[Any] = []
+    try:
+        if start_date:
+            filters.append(column >= datetime.strptime(start_date, "%Y-%m-%d"))
+        if end_date:
+            end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            filters.append(column < end)
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail="Invalid date format. Date should be YYYY-MM-DD",
+        )
+    return filters
+
+
+def _encode_chunk(rows: Sequence[Any], columns: List[str], fmt: str) -> bytes:
+    """`rows` as CSV lines, NDJSON lines or comma-separated JSON objects"""
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerows([format_value(value) for value in row] for row in rows)
+    elif fmt == "json":
+        buffer.write(
+            ",".join(
+                json.dumps(
+                    {name: format_value(value) for name, value in zip(columns, row)},
+                    ensure_ascii=False,
+                    separators=(",", ":"),
+                )
+                for row in rows
+            )
+        )
+    else:
+        for row in rows:
+            record = {name: format_value(value) for name, value in zip(columns, row)}
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write("\n")
+    return buffer.getvalue().encode()
+
+
+async def _partitions(engine: AsyncEngine, query: Any) -> AsyncIterator[Sequence[Any]]:
+    """
+    Rows of `query` in chunks of EXPORT_CHUNK_ROWS from a server-side cursor,
+    on a connection of its own: the request's session may be closed before
+    the body has finished streaming
+    """
+    async with engine.connect() as conn:
+        try:
+            await conn.execute(
+                text(
+                    "SET LOCAL idle_in_transaction_session_timeout"
+                    f" = {EXPORT_IDLE_TIMEOUT_MS}"
+                )
+            )
+            result = await conn.stream(
+                query.execution_options(yield_per=EXPORT_CHUNK_ROWS)
+            )
+            async for rows in result.partitions():
+                yield rows
+        except Exception as e:
+            # Headers are already sent; all we can do is stop the stream
+            logger.error(f"Streaming query failed mid-stream: {e}")
+            raise
+
+
+async def _stream_rows(
+    request: Request, query: Any, columns: List[str], fmt: str
+) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        # Send the header straight away so the client sees the first byte
+        # before the query has produced anything
+        yield _encode_chunk([columns], columns, fmt)
+
+    # On a replica when there is one, unless the client just wrote
+    engine = read_engine(await prefers_primary(request))
+    async for rows in _partitions(engine, query):
+        yield _encode_chunk(rows, columns, fmt)
+
+
+async def _stream_json_list(
+    engine: AsyncEngine, query: Any, columns: List[str]
+) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for rows in _partitions(engine, query):
+        yield separator + _encode_chunk(rows, columns, "json")
+        separator = b","
+    yield b"]"
+
+
+def stream_json_list(
+    engine: AsyncEngine, query: Any, columns: List[str], headers: Dict[str, str]
+) -> StreamingResponse:
+    """
+    Every row of `query` as one JSON list of `columns` objects, streamed the
+    way exports are, for responses too large to build in memory
+    """
+    return StreamingResponse(
+        _stream_json_list(engine, query, columns),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def export_rows(
+    request: Request,
+    model: Type[SQLModel],
+    read_model: Type[SQLModel],
+    filters: Sequence[Any],
+    fmt: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """
+    Stream every `model` row matching `filters`, ordered by (tanggal, id),
+    as CSV or NDJSON. Rows are read through a server-side cursor in chunks of
+    EXPORT_CHUNK_ROWS, so memory stays flat regardless of the date range.
+    """
+    columns = list(read_model.model_fields)
+    query = (
+        select(*[getattr(model, name) for name in columns])
+        .where(*filters)
+        .order_by(getattr(model, "tanggal"), getattr(model, "id"))
+    )
+    return StreamingResponse(
+        _stream_rows(request, query, columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
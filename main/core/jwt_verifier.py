@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, TypedDict
+
+from jose import ExpiredSignatureError, JWTError, jwt
+from sqlalchemy import text
+
+from core.db import async_engine
+from core.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+USER_REFRESH_SECONDS = float(os.getenv("AUTH_USER_REFRESH_SECONDS", "60"))
+
+
+class TokenVerification(TypedDict, total=False):
+    valid: bool
+    error: str
+    user_id: int
+
+
+class JWTSettings(TypedDict):
+    key: str
+    algorithm: str
+    audience: Optional[str]
+    issuer: Optional[str]
+    leeway: float
+    user_id_claim: str
+    token_type_claim: Optional[str]
+
+
+@lru_cache(maxsize=1)
+def jwt_settings() -> JWTSettings:
+    """
+    Read the SIMPLE_JWT settings shared with the Django auth service, so both
+    sides agree on the key, algorithm and claims. Requires Django settings to
+    be configured.
+    """
+    from rest_framework_simplejwt.settings import api_settings
+
+    leeway = api_settings.LEEWAY
+    if isinstance(leeway, timedelta):
+        leeway = leeway.total_seconds()
+
+    return {
+        # Asymmetric algorithms verify with the public key
+        "key": api_settings.VERIFYING_KEY or api_settings.SIGNING_KEY,
+        "algorithm": api_settings.ALGORITHM,
+        "audience": api_settings.AUDIENCE,
+        "issuer": api_settings.ISSUER,
+        "leeway": float(leeway or 0),
+        "user_id_claim": api_settings.USER_ID_CLAIM,
+        "token_type_claim": api_settings.TOKEN_TYPE_CLAIM,
+    }
+
+
+class UserDirectory:
+    """
+    In-memory set of Django user ids (auth_user), reloaded in the background
+    so token verification does not query the database per request. Ids that
+    are not in the snapshot get one direct lookup, with the answer cached.
+    """
+
+    def __init__(self, refresh_interval: float = USER_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self._ids: FrozenSet[int] = frozenset()
+        self._lookups: TTLCache[bool] = TTLCache(maxsize=1000, ttl=refresh_interval)
+        self.loaded = False
+
+    async def refresh(self) -> None:
+        async with async_engine.connect() as conn:
+            result = await conn.execute(text("SELECT id FROM auth_user"))
+            self._ids = frozenset(row[0] for row in result)
+        self._lookups.clear()
+        self.loaded = True
+        logger.debug(f"Loaded {len(self._ids)} user ids")
+
+    async def run(self) -> None:
+        """Reload the snapshot every refresh_interval seconds"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh user directory: {e}")
+
+    async def exists(self, user_id: int) -> bool:
+        if user_id in self._ids:
+            return True
+
+        known = self._lookups.get(str(user_id))
+        if known is not None:
+            return known
+
+        # Users created since the last refresh
+        async with async_engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT 1 FROM auth_user WHERE id = :user_id"),
+                {"user_id": user_id},
+            )
+            found = result.first() is not None
+        self._lookups.set(str(user_id), found)
+        return found
+
+
+user_directory = UserDirectory()
+
+
+def decode_access_token(raw_token: str) -> Dict[str, Any]:
+    """Verify signature, expiry and token type; raises JWTError when invalid"""
+    settings = jwt_settings()
+    claims = jwt.decode(
+        raw_token,
+        settings["key"],
+        algorithms=[settings["algorithm"]],
+        audience=settings["audience"],
+        issuer=settings["issuer"],
+        options={
+            "verify_aud": settings["audience"] is not None,
+            "leeway": settings["leeway"],
+        },
+    )
+
+    token_type_claim = settings["token_type_claim"]
+    if token_type_claim and claims.get(token_type_claim) != "access":
+        raise JWTError("Token has wrong type")
+    return claims
+
+
+async def verify_access_token(raw_token: str) -> TokenVerification:
+    """
+    Event-loop equivalent of services.verify_token_logic for Bearer tokens.
+    Returns a dictionary with validation results.
+    """
+    try:
+        claims = decode_access_token(raw_token)
+        user_id = int(claims[jwt_settings()["user_id_claim"]])
+    except ExpiredSignatureError:
+        return {"valid": False, "error": "Token has expired"}
+    except (JWTError, KeyError, TypeError, ValueError):
+        return {"valid": False, "error": "Invalid token"}
+
+    if not await user_directory.exists(user_id):
+        return {"valid": False, "error": "User not found"}
+
+    return {"valid": True, "user_id": user_id}
@@ -0,0 +1,216 @@
+import os
+import time
+from typing import Any, Dict
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from redis import asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.timing import record_checkout
+
+# With several workers each process writes its samples under this directory
+# (see support/uvicorn.sh) and /metrics merges them, so any worker can answer
+# a scrape. Unset means single-process mode with the default registry.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent getting a connection from the pool",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_CONNECT_TIME = Histogram(
+    "db_pool_connect_seconds",
+    "Time spent opening a new database connection",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_SIZE = Gauge(
+    "db_pool_size", "Configured pool size", ["engine"], multiprocess_mode="livesum"
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool fills up)",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by cache and outcome", ["cache", "result"]
+)
+
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round-trip time by command",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Path template of the matched route, e.g. /url/{code}. Labelling by the
+    template rather than the raw path keeps label cardinality bounded.
+    """
+    # Newer FastAPI keeps include_router prefixes off the route itself and
+    # records the prefixed route here instead
+    route = scope.get("fastapi", {}).get("effective_route_context")
+    if route is None:
+        route = scope.get("route")
+    return getattr(route, "path_format", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Records latency, status and in-flight count for every HTTP request"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.labels(
+                scope["method"], _route_template(scope), str(status)
+            ).observe(time.perf_counter() - start)
+
+
+# Label of each instrumented sync Engine, for the session events below
+_engine_names: Dict[Engine, str] = {}
+
+
+def instrument_pool(engine: Any, name: str) -> None:
+    """Export pool usage and connect time for a sync Engine or AsyncEngine"""
+    sync_engine: Engine = getattr(engine, "sync_engine", engine)
+    pool: Any = sync_engine.pool
+    _engine_names[sync_engine] = name
+
+    def update(*_: Any) -> None:
+        POOL_SIZE.labels(name).set(pool.size())
+        POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        POOL_OVERFLOW.labels(name).set(pool.overflow())
+
+    # The retrying do_connect in core.db returns the connection itself, so
+    # this one never runs after it; it sets the same mark instead
+    @event.listens_for(sync_engine, "do_connect")
+    def connecting(dialect: Any, record: Any, *_: Any) -> None:
+        record.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(pool, "connect")
+    def connected(dbapi_connection: Any, record: Any) -> None:
+        started = record.info.pop("connect_started", None)
+        if started is not None:
+            POOL_CONNECT_TIME.labels(name).observe(time.perf_counter() - started)
+
+    event.listen(pool, "checkout", update)
+    event.listen(pool, "checkin", update)
+    update()
+
+
+# Pool events only fire once a connection has been handed out, so the wait
+# for one is timed from the session instead: from just before an execute or
+# flush that may need a connection to the begin on the connection it got.
+# Connections opened directly with engine.connect() are not included.
+@event.listens_for(Session, "do_orm_execute")
+def _before_execute(state: ORMExecuteState) -> None:
+    state.session.info["connection_wanted"] = time.perf_counter()
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session: Session, *_: Any) -> None:
+    session.info["connection_wanted"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _after_begin(
+    session: Session, transaction: SessionTransaction, connection: Connection
+) -> None:
+    started = session.info.pop("connection_wanted", None)
+    name = _engine_names.get(connection.engine)
+    if started is None or name is None or transaction.nested:
+        return
+    elapsed = time.perf_counter() - started
+    POOL_CHECKOUT_WAIT.labels(name).observe(elapsed)
+    record_checkout(elapsed)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session: Session, transaction: SessionTransaction) -> None:
+    # An execute on a connection the session already had leaves its mark
+    session.info.pop("connection_wanted", None)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """Redis client that times every command it sends"""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = args[0] if args else "unknown"
+            if isinstance(command, bytes):
+                command = command.decode()
+            REDIS_LATENCY.labels(str(command).upper()).observe(
+                time.perf_counter() - start
+            )
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges at shutdown (multiprocess mode only)"""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def metrics(request: Request) -> Response:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,184 @@
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.sql.selectable import Select
+from sqlmodel import SQLModel
+
+from core.export import format_value, stream_json_list
+from core.ttl_cache import TTLCache
+
+# Pagination is opt-in: without limit or cursor a list returns every matching
+# row, as it did before, streamed from a server-side cursor so memory stays
+# bounded. This is the page size for a cursor without a limit.
+DEFAULT_PAGE_SIZE = int(os.getenv("LIST_DEFAULT_PAGE_SIZE", "500"))
+MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+COUNT_CACHE_TTL = float(os.getenv("LIST_COUNT_CACHE_TTL", "60"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_COUNT_TYPE_HEADER = "X-Total-Count-Type"
+PAGINATION_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_COUNT_TYPE_HEADER]
+
+CountMode = Literal["estimate", "exact"]
+
+# Exact counts keyed by the compiled filter query
+count_cache: TTLCache[int] = TTLCache(maxsize=1000, ttl=COUNT_CACHE_TTL)
+
+
+class explain(Executable, ClauseElement):
+    """
+    EXPLAIN (FORMAT JSON) wrapper that keeps the statement's bind params.
+    With analyze=True the statement is run and actual row counts reported.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select, analyze: bool = False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element: explain, compiler: Any, **kw: Any) -> str:
+    options = "ANALYZE, FORMAT JSON" if element.analyze else "FORMAT JSON"
+    return f"EXPLAIN ({options}) " + compiler.process(element.statement, **kw)
+
+
+def encode_cursor(tanggal: datetime, row_id: int) -> str:
+    raw = json.dumps([tanggal.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tanggal, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(tanggal), int(row_id)
+    except (binascii.Error, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """Validate a comma-separated field list; None means all fields"""
+    if not fields:
+        return list(allowed)
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    # Keep the schema's field order, as full rows have
+    return [name for name in allowed if name in requested]
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """Planner row estimate for the filtered query; cheap but approximate"""
+    result = await db.execute(explain(query))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def exact_count(db: AsyncSession, query: Select) -> int:
+    """COUNT(*) for the filtered query, cached for COUNT_CACHE_TTL seconds"""
+    compiled = query.compile()
+    key = f"{compiled}|{sorted(compiled.params.items())}"
+    total = count_cache.get(key)
+    if total is None:
+        total = (
+            await db.execute(select(func.count()).select_from(query.subquery()))
+        ).scalar_one()
+        count_cache.set(key, total)
+    return total
+
+
+def page_query(
+    model: Type[SQLModel],
+    columns: Sequence[str],
+    filters: Sequence[Any],
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+) -> Select:
+    """
+    `columns` plus the (tanggal, id) sort key of the rows after `cursor`; a
+    limit of None returns them all
+    """
+    tanggal_col = getattr(model, "tanggal")
+    id_col = getattr(model, "id")
+    query = (
+        select(*[getattr(model, name) for name in columns], tanggal_col, id_col)
+        .where(*filters)
+        .order_by(tanggal_col, id_col)
+        .limit(limit)
+    )
+    if cursor:
+        after_tanggal, after_id = decode_cursor(cursor)
+        # The plain range on tanggal is redundant, but unlike the row
+        # comparison it prunes earlier partitions and works as an index bound
+        # after the equality filters
+        query = query.where(
+            tanggal_col >= after_tanggal,
+            tuple_(tanggal_col, id_col) > (after_tanggal, after_id),
+        )
+    return query
+
+
+async def paginate(
+    db: AsyncSession,
+    model: Type[SQLModel],
+    read_model: Type[SQLModel],
+    filters: Sequence[Any],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    count: Optional[CountMode] = None,
+) -> Response:
+    """
+    `model` rows ordered by (tanggal, id), as a JSON list of the requested
+    `read_model` fields. Without `limit` and `cursor` every matching row is
+    streamed, on a connection to the session's engine; with either it is one
+    page (DEFAULT_PAGE_SIZE when only a cursor is given). The cursor for the
+    next page and the total count (when asked for) are returned in headers,
+    so the body keeps the shape existing clients expect.
+    """
+    columns = parse_fields(fields, list(read_model.model_fields))
+    filtered = select(getattr(model, "id")).where(*filters)
+    headers: Dict[str, str] = {}
+    if count == "estimate":
+        headers[TOTAL_COUNT_HEADER] = str(await estimate_count(db, filtered))
+        headers[TOTAL_COUNT_TYPE_HEADER] = "estimate"
+    elif count == "exact":
+        headers[TOTAL_COUNT_HEADER] = str(await exact_count(db, filtered))
+        headers[TOTAL_COUNT_TYPE_HEADER] = "exact"
+
+    if limit is None and not cursor:
+        query = page_query(model, columns, filters, None)
+        return stream_json_list(db.bind, query, columns, headers)
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    rows = (
+        await db.execute(page_query(model, columns, filters, limit + 1, cursor))
+    ).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # The two trailing columns are always the sort key
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1][-2], rows[-1][-1])
+
+    content = [
+        {name: format_value(value) for name, value in zip(columns, row)} for row in rows
+    ]
+    return JSONResponse(content=content, headers=headers)
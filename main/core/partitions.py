@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Attendance tables partitioned by month on tanggal (see the
+# absen_monthly_partitions migration)
+PARTITIONED_TABLES = ["rec_absen_pengajian", "rec_absen_asramaan"]
+
+# Partitions are created this many months before they are needed
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Months older than this are detached and moved to PARTITION_ARCHIVE_SCHEMA,
+# where they can be dumped or dropped; 0 keeps everything attached
+PARTITION_ARCHIVE_AFTER_MONTHS = int(os.getenv("PARTITION_ARCHIVE_AFTER_MONTHS", "0"))
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+PARTITION_CHECK_SECONDS = float(os.getenv("PARTITION_CHECK_SECONDS", "3600"))
+
+# Fails the DDL instead of queueing check-ins behind a long lock wait
+_LOCK_TIMEOUT = "5s"
+_LOCK_KEY = 0x61627365  # "abse"
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def _attached_months(conn: AsyncConnection, table: str) -> Dict[date, str]:
+    result = await conn.execute(
+        text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+            """),
+        {"table": table},
+    )
+    months = {}
+    for (name,) in result:
+        match = _MONTH_SUFFIX.search(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+    return months
+
+
+async def _archive(conn: AsyncConnection, table: str, partition: str) -> None:
+    await conn.execute(
+        text(f'CREATE SCHEMA IF NOT EXISTS "{PARTITION_ARCHIVE_SCHEMA}"')
+    )
+    await conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"'))
+    await conn.execute(
+        text(f'ALTER TABLE "{partition}" SET SCHEMA "{PARTITION_ARCHIVE_SCHEMA}"')
+    )
+
+
+class PartitionMaintainer:
+    """
+    Creates the attendance partitions for the current month and the next
+    PARTITION_MONTHS_AHEAD, and archives the ones past
+    PARTITION_ARCHIVE_AFTER_MONTHS. Every worker runs it; an advisory lock
+    makes the others skip a round while one is at it.
+    """
+
+    async def maintain(self, today: Optional[date] = None) -> Dict[str, List[str]]:
+        """Returns the partitions created and archived"""
+        this_month = (today or date.today()).replace(day=1)
+        changes: Dict[str, List[str]] = {"created": [], "archived": []}
+
+        async with async_engine.begin() as conn:
+            locked = await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _LOCK_KEY}
+            )
+            if not locked:
+                return changes
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+
+            for table in PARTITIONED_TABLES:
+                for ahead in range(PARTITION_MONTHS_AHEAD + 1):
+                    month = add_months(this_month, ahead)
+                    created = await conn.scalar(
+                        text("SELECT absen_create_partition(:table, :month)"),
+                        {"table": table, "month": month},
+                    )
+                    if created:
+                        changes["created"].append(f"{table}_p{month:%Y_%m}")
+
+                if PARTITION_ARCHIVE_AFTER_MONTHS > 0:
+                    cutoff = add_months(this_month, -PARTITION_ARCHIVE_AFTER_MONTHS)
+                    months = await _attached_months(conn, table)
+                    for month, partition in sorted(months.items()):
+                        if month < cutoff:
+                            await _archive(conn, table, partition)
+                            changes["archived"].append(partition)
+
+        for action, partitions in changes.items():
+            if partitions:
+                logger.info(f"Partitions {action}: {', '.join(partitions)}")
+        return changes
+
+    async def run(self) -> None:
+        """Repeat maintain() every PARTITION_CHECK_SECONDS"""
+        while True:
+            await asyncio.sleep(PARTITION_CHECK_SECONDS)
+            try:
+                await self.maintain()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+
+
+partition_maintainer = PartitionMaintainer()
+
+
+if __name__ == "__main__":
+    # For running from cron instead of (or as well as) the app workers
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(partition_maintainer.maintain())
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from core.conditional import Payload
+from core.db import async_session_factory
+from schema.data_daerah_schema import DataDaerah
+from schema.data_hobi_schema import DataHobi
+from schema.data_kelas_sekolah_schema import DataKelasSekolah
+from schema.data_materi_schema import DataMateri
+from schema.sesi_schema import Sesi
+
+logger = logging.getLogger(__name__)
+
+# Full reload interval, and how often the version key is checked in between
+REFRESH_SECONDS = float(os.getenv("REFERENCE_REFRESH_SECONDS", "300"))
+VERSION_POLL_SECONDS = float(os.getenv("REFERENCE_VERSION_POLL_SECONDS", "5"))
+# INCR this key (e.g. after editing a reference table) to reload every worker
+VERSION_KEY = "reference-data:version"
+
+Rows = List[Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """
+    Reference tables indexed by the keys the endpoints look them up by. Each
+    response is serialized once here, so requests only copy bytes out.
+    """
+
+    materi: Dict[str, Payload] = field(default_factory=dict)
+    materi_by_detail: Dict[Tuple[str, str], Payload] = field(default_factory=dict)
+    sesi: Dict[str, Payload] = field(default_factory=dict)
+    daerah: Dict[str, Payload] = field(default_factory=dict)
+    hobi: Payload = Payload.of([])
+    kelas_sekolah: Payload = Payload.of([])
+    loaded_at: float = 0.0
+
+
+async def _all(db: AsyncSession, model: Any) -> Sequence[Any]:
+    return (await db.execute(select(model).order_by(model.id))).scalars().all()
+
+
+async def load_snapshot() -> ReferenceSnapshot:
+    materi: Dict[str, Rows] = defaultdict(list)
+    materi_by_detail: Dict[Tuple[str, str], Rows] = defaultdict(list)
+    sesi: Dict[str, Rows] = defaultdict(list)
+    daerah: Dict[str, Rows] = defaultdict(list)
+
+    async with async_session_factory() as db:
+        for item in await _all(db, DataMateri):
+            row = {
+                "materi": item.materi,
+                "detail_materi": item.detail_materi,
+                "detail_kategori": item.detail_kategori,
+                "indikator": item.indikator,
+                "indikator_mulai": item.indikator_mulai,
+                "indikator_akhir": item.indikator_akhir,
+            }
+            materi[item.kategori].append(row)
+            materi_by_detail[(item.kategori, item.detail_kategori)].append(row)
+
+        for item in await _all(db, Sesi):
+            sesi[item.acara].append(
+                {
+                    "sesi": item.sesi,
+                    "waktu": item.waktu.strftime("%H:%M") if item.waktu else None,
+                }
+            )
+
+        for item in await _all(db, DataDaerah):
+            daerah[item.daerah].append(
+                {"ranah": item.ranah, "detail_ranah": item.detail_ranah}
+            )
+
+        hobi = [
+            {"kategori": item.kategori, "hobi": item.hobi}
+            for item in await _all(db, DataHobi)
+        ]
+        kelas_sekolah = [
+            {"jenjang": item.jenjang, "kelas": item.kelas}
+            for item in await _all(db, DataKelasSekolah)
+        ]
+
+    return ReferenceSnapshot(
+        materi={key: Payload.of(rows) for key, rows in materi.items()},
+        materi_by_detail={
+            key: Payload.of(rows) for key, rows in materi_by_detail.items()
+        },
+        sesi={key: Payload.of(rows) for key, rows in sesi.items()},
+        daerah={key: Payload.of(rows) for key, rows in daerah.items()},
+        hobi=Payload.of(hobi),
+        kelas_sekolah=Payload.of(kelas_sekolah),
+        loaded_at=time.time(),
+    )
+
+
+class ReferenceData:
+    """
+    In-memory copy of the small lookup tables (materi, sesi, daerah, hobi,
+    kelas sekolah). A refresh builds a new snapshot and swaps it in whole, so
+    readers never see a half-loaded state.
+    """
+
+    def __init__(self) -> None:
+        self.snapshot: Optional[ReferenceSnapshot] = None
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        snapshot = await load_snapshot()
+        self.snapshot = snapshot
+        logger.debug(
+            f"Loaded reference data: {len(snapshot.materi)} kategori, "
+            f"{len(snapshot.sesi)} acara, {len(snapshot.daerah)} daerah"
+        )
+
+    async def current(self) -> ReferenceSnapshot:
+        """The loaded snapshot, loading it first if startup did not"""
+        if self.snapshot is None:
+            async with self._lock:
+                if self.snapshot is None:
+                    await self.refresh()
+        assert self.snapshot is not None
+        return self.snapshot
+
+    async def _read_version(self, redis: Any) -> Optional[int]:
+        try:
+            return int(await redis.get(VERSION_KEY) or 0)
+        except RedisError as e:
+            logger.error(f"Failed to read reference data version: {e}")
+            return None
+
+    async def run(self, redis: Any) -> None:
+        """Reload on a version bump, or every REFRESH_SECONDS regardless"""
+        self._version = await self._read_version(redis)
+        while True:
+            await asyncio.sleep(VERSION_POLL_SECONDS)
+            version = await self._read_version(redis)
+            bumped = version is not None and version != self._version
+            due = (
+                self.snapshot is None
+                or time.time() - self.snapshot.loaded_at >= REFRESH_SECONDS
+            )
+            if not (bumped or due):
+                continue
+            try:
+                await self.refresh()
+                if version is not None:
+                    self._version = version
+            except Exception as e:
+                # Keep serving the previous snapshot
+                logger.error(f"Failed to refresh reference data: {e}")
+
+
+reference_data = ReferenceData()
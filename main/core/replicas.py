@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
+
+from fastapi import Request
+from redis.exceptions import RedisError
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.db import async_engine, async_session_factory, replica_engines
+
+logger = logging.getLogger(__name__)
+
+REPLICA_CHECK_SECONDS = float(os.getenv("REPLICA_CHECK_SECONDS", "5"))
+# Replicas further behind than this stop receiving reads until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+# How long a replica that failed is left out before it is tried again
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))
+
+# After a successful write the client reads from the primary for this long,
+# so it sees its own changes despite replication lag. Browsers are marked with
+# a cookie, clients without a cookie jar by their credential in Redis.
+STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+STICKY_COOKIE = "db_primary_until"
+STICKY_KEY_PREFIX = "db-primary"
+
+# 0 when the replica has replayed everything it received (or is not a
+# standby at all), otherwise the age of the last replayed transaction
+_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """)
+
+
+class ReplicaRouter:
+    """
+    Round-robin over the replicas that are currently healthy. A replica is
+    ejected when a health check fails, when it lags too far behind, or when
+    a query on it loses its connection; the background check puts it back
+    once it passes again.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self._ejected_until: Dict[int, float] = {}
+        self._turn = itertools.count()
+        for index, engine in enumerate(engines):
+            event.listen(engine.sync_engine, "handle_error", self._on_error(index))
+
+    def _on_error(self, index: int) -> Callable[[Any], None]:
+        def handle_error(context: Any) -> None:
+            if context.is_disconnect or isinstance(context.original_exception, OSError):
+                self.eject(index, f"connection error: {context.original_exception}")
+
+        return handle_error
+
+    def eject(self, index: int, reason: str) -> None:
+        if index not in self._ejected_until:
+            logger.warning(f"Ejecting read replica {index}: {reason}")
+        self._ejected_until[index] = time.monotonic() + REPLICA_EJECT_SECONDS
+
+    def reinstate(self, index: int) -> None:
+        if self._ejected_until.pop(index, None) is not None:
+            logger.info(f"Read replica {index} is back in rotation")
+
+    def healthy(self) -> List[AsyncEngine]:
+        now = time.monotonic()
+        return [
+            engine
+            for index, engine in enumerate(self.engines)
+            if self._ejected_until.get(index, 0) <= now
+        ]
+
+    def pick(self) -> AsyncEngine:
+        """Next healthy replica, or the primary when there is none"""
+        healthy = self.healthy()
+        if not healthy:
+            return async_engine
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def _check(self, index: int, engine: AsyncEngine) -> None:
+        try:
+            async with engine.connect() as conn:
+                lag = float(await conn.scalar(_LAG_QUERY) or 0)
+        except Exception as e:
+            self.eject(index, f"health check failed: {e}")
+            return
+        if lag > REPLICA_MAX_LAG_SECONDS:
+            self.eject(index, f"{lag:.1f}s behind the primary")
+        else:
+            self.reinstate(index)
+
+    async def check(self) -> None:
+        await asyncio.gather(
+            *(self._check(index, engine) for index, engine in enumerate(self.engines))
+        )
+
+    async def run(self) -> None:
+        """Re-check every replica every REPLICA_CHECK_SECONDS"""
+        while True:
+            await asyncio.sleep(REPLICA_CHECK_SECONDS)
+            await self.check()
+
+
+replica_router = ReplicaRouter(replica_engines)
+
+
+def _sticky_key(authorization: str) -> str:
+    return f"{STICKY_KEY_PREFIX}:{hashlib.sha256(authorization.encode()).hexdigest()}"
+
+
+async def prefers_primary(request: Request) -> bool:
+    """Whether this client wrote recently enough to need the primary"""
+    if not replica_engines:
+        return False
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+
+    authorization = request.headers.get("authorization")
+    redis = getattr(request.app.state, "redis", None)
+    if not authorization or redis is None:
+        return False
+    try:
+        return bool(await redis.exists(_sticky_key(authorization)))
+    except RedisError as e:
+        logger.error(f"Sticky primary lookup failed: {e}")
+        return False
+
+
+def read_engine(primary: bool = False) -> AsyncEngine:
+    if primary:
+        return async_engine
+    return replica_router.pick()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints: a replica when one is configured and
+    healthy, the primary right after this client wrote something.
+    """
+    engine = read_engine(await prefers_primary(request))
+    async with async_session_factory(bind=engine) as session:
+        yield session
+
+
+class StickyPrimaryMiddleware:
+    """Marks clients that just wrote so their next reads go to the primary"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in ("GET", "HEAD", "OPTIONS")
+            or not replica_engines
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                # The API is called cross-site from the frontends, where a
+                # Lax cookie would not be sent with the next fetch
+                cookie = (
+                    f"{STICKY_COOKIE}={int(time.time()) + STICKY_SECONDS}; "
+                    f"Max-Age={STICKY_SECONDS}; Path=/; HttpOnly; Secure; "
+                    "SameSite=None"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+                await self._mark_credential(scope)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _mark_credential(self, scope: Scope) -> None:
+        """Sticky key for the request's Authorization header, if it has one"""
+        authorization = next(
+            (
+                value.decode("latin-1")
+                for name, value in scope["headers"]
+                if name == b"authorization"
+            ),
+            None,
+        )
+        redis = getattr(scope["app"].state, "redis", None)
+        if not authorization or redis is None:
+            return
+        try:
+            await redis.set(_sticky_key(authorization), 1, ex=STICKY_SECONDS)
+        except RedisError as e:
+            logger.error(f"Failed to mark client for the primary: {e}")
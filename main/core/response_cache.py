@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import os
+import secrets
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from core.metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "view-cache"
+# How long past expiry a value may still be served while one request refreshes it
+STALE_SECONDS = int(os.getenv("VIEW_CACHE_STALE_SECONDS", "60"))
+# Upper bound on a recompute; also how long other requests wait for it
+LOCK_SECONDS = int(os.getenv("VIEW_CACHE_LOCK_SECONDS", "10"))
+POLL_INTERVAL = 0.05
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def get_redis(request: Request) -> Any:
+    """Dependency returning the shared Redis client set up in lifespan"""
+    return getattr(request.app.state, "redis", None)
+
+
+def _encode(body: bytes, fresh_until: float) -> bytes:
+    return b"%d\n" % int(fresh_until) + body
+
+
+def _decode(entry: bytes) -> Tuple[float, bytes]:
+    fresh_until, _, body = entry.partition(b"\n")
+    return float(fresh_until), body
+
+
+class ResponseCache:
+    """
+    Redis cache for one pre-serialized response body.
+
+    The key embeds a version number that writers bump with invalidate(), so
+    new data is visible immediately. On a miss only the request holding the
+    recompute lock runs `compute`; the others wait for its result, or keep
+    getting the previous value for up to STALE_SECONDS after it expired.
+    """
+
+    def __init__(self, name: str, ttl: int = 300):
+        self.name = name
+        self.ttl = ttl
+        self.version_key = f"{CACHE_PREFIX}:{name}:version"
+
+    async def _key(self, redis: Any) -> str:
+        version = await redis.get(self.version_key)
+        return f"{CACHE_PREFIX}:{self.name}:v{int(version or 0)}"
+
+    async def _recompute(
+        self, redis: Any, key: str, compute: Callable[[], Awaitable[bytes]]
+    ) -> Optional[bytes]:
+        """Run compute under the lock; None if another request holds it"""
+        token = secrets.token_hex(8)
+        lock_key = f"{key}:lock"
+        if not await redis.set(lock_key, token, nx=True, ex=LOCK_SECONDS):
+            return None
+        try:
+            body = await compute()
+            await redis.set(
+                key,
+                _encode(body, time.time() + self.ttl),
+                ex=self.ttl + STALE_SECONDS,
+            )
+            return body
+        finally:
+            await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+
+    async def get_or_compute(
+        self, redis: Any, compute: Callable[[], Awaitable[bytes]]
+    ) -> Tuple[bytes, str]:
+        """Return (body, status) where status is HIT, STALE or MISS"""
+        body, status = await self._get_or_compute(redis, compute)
+        CACHE_LOOKUPS.labels(f"view:{self.name}", status.lower()).inc()
+        return body, status
+
+    async def _get_or_compute(
+        self, redis: Any, compute: Callable[[], Awaitable[bytes]]
+    ) -> Tuple[bytes, str]:
+        if redis is None:
+            return await compute(), "MISS"
+
+        try:
+            key = await self._key(redis)
+            deadline = time.monotonic() + LOCK_SECONDS
+            while True:
+                entry = await redis.get(key)
+                if entry is not None:
+                    fresh_until, body = _decode(entry)
+                    if time.time() < fresh_until:
+                        return body, "HIT"
+                    # Expired: one request refreshes, everyone else gets stale
+                    fresh = await self._recompute(redis, key, compute)
+                    return (fresh, "MISS") if fresh is not None else (body, "STALE")
+
+                body = await self._recompute(redis, key, compute)
+                if body is not None:
+                    return body, "MISS"
+                if time.monotonic() >= deadline:
+                    break
+                # Someone else is computing it; wait for their result
+                await asyncio.sleep(POLL_INTERVAL)
+        except RedisError as e:
+            logger.error(f"View cache {self.name} unavailable: {e}")
+
+        return await compute(), "MISS"
+
+    async def invalidate(self, redis: Any) -> None:
+        """Bump the version so the next read recomputes"""
+        if redis is None:
+            return
+        try:
+            await redis.incr(self.version_key)
+        except RedisError as e:
+            # The write itself succeeded; the old value expires within ttl
+            logger.error(f"Failed to invalidate view cache {self.name}: {e}")
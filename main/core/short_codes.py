@@ -0,0 +1,66 @@
+import asyncio
+import os
+import string
+from collections import deque
+from typing import Deque, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CODE_SEQUENCE = "rec_shorten_urls_code_seq"
+# Sequence numbers fetched per round-trip when a worker runs out
+BLOCK_SIZE = int(os.getenv("URL_CODE_BLOCK_SIZE", "100"))
+
+ALPHABET = string.digits + string.ascii_letters
+CODE_LENGTH = 7
+CODE_SPACE = len(ALPHABET) ** CODE_LENGTH  # ~3.5 trillion codes
+
+# n -> (n * MULTIPLIER + OFFSET) mod CODE_SPACE is a bijection because the
+# multiplier is coprime to 62^7, so consecutive sequence numbers map to
+# unrelated-looking codes that can never collide. Changing either constant
+# after codes have been issued breaks that guarantee.
+MULTIPLIER = 2176477521739  # ~ CODE_SPACE / golden ratio, odd, not a multiple of 31
+OFFSET = 1234567890123
+
+
+def encode_code(number: int) -> str:
+    """7-character base62 code for a sequence number"""
+    value = (number * MULTIPLIER + OFFSET) % CODE_SPACE
+    chars = []
+    for _ in range(CODE_LENGTH):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+class CodeAllocator:
+    """
+    Hands out short codes from blocks of sequence numbers reserved in one
+    query. Codes are 7 characters, so they never clash with the older random
+    6-character codes either. Numbers left in a block when a worker exits are
+    simply never used.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._numbers: Deque[int] = deque()
+        self._lock = asyncio.Lock()
+
+    async def _reserve(self, db: AsyncSession, count: int) -> None:
+        result = await db.execute(
+            text(f"SELECT nextval('{CODE_SEQUENCE}') FROM generate_series(1, :n)"),
+            {"n": count},
+        )
+        self._numbers.extend(result.scalars().all())
+
+    async def allocate(self, db: AsyncSession, count: int = 1) -> List[str]:
+        async with self._lock:
+            missing = count - len(self._numbers)
+            if missing > 0:
+                # Top up in whole blocks; large batches reserve what they need
+                blocks = -(-missing // self.block_size)
+                await self._reserve(db, blocks * self.block_size)
+            return [encode_code(self._numbers.popleft()) for _ in range(count)]
+
+
+code_allocator = CodeAllocator()
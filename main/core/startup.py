@@ -0,0 +1,38 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Startup taking longer than this is logged as a warning
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+
+
+class StartupTimer:
+    """Times each lifespan startup step and reports them against the budget"""
+
+    def __init__(self, budget: float = STARTUP_BUDGET_SECONDS):
+        self.budget = budget
+        self.steps: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        return sum(seconds for _, seconds in self.steps)
+
+    def report(self) -> None:
+        breakdown = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.steps)
+        message = f"Startup took {self.total:.3f}s ({breakdown})"
+        if self.total > self.budget:
+            logger.warning(f"{message}, over the {self.budget:.1f}s budget")
+        else:
+            logger.info(message)
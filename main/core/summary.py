@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+
+async def add_to_summary(
+    db: AsyncSession,
+    summary_model: Type[SQLModel],
+    key_fields: Sequence[str],
+    rows: Sequence[Mapping[str, Any]],
+) -> None:
+    """
+    Count newly inserted check-ins into the per-day rollup table, in the
+    caller's transaction. `rows` need a datetime `tanggal` and every key field.
+    """
+    counts: Counter[Tuple[Any, ...]] = Counter(
+        (row["tanggal"].date(), *[row[field] for field in key_fields]) for row in rows
+    )
+    if not counts:
+        return
+
+    columns = ["tanggal", *key_fields]
+    stmt = pg_insert(summary_model).values(
+        # Sorted so concurrent batches lock rollup rows in the same order
+        [dict(zip(columns, key), jumlah=n) for key, n in sorted(counts.items())]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=columns,
+        set_={"jumlah": getattr(summary_model, "jumlah") + stmt.excluded.jumlah},
+    )
+    await db.execute(stmt)
+
+
+def parse_group_by(group_by: Optional[str], allowed: Sequence[str]) -> List[str]:
+    requested = [name.strip() for name in (group_by or "").split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=422,
+            detail=f"group_by must be a comma-separated subset of: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=422,
+            detail="Invalid date format. Date should be YYYY-MM-DD",
+        )
+
+
+async def summarize(
+    db: AsyncSession,
+    summary_model: Type[SQLModel],
+    group_by: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    **equals: Optional[str],
+) -> List[Dict[str, Any]]:
+    """
+    Attendance counts grouped by `group_by`, read from the rollup table.
+    Dates are inclusive; remaining keyword arguments are equality filters
+    on rollup columns and are skipped when None.
+    """
+    tanggal = getattr(summary_model, "tanggal")
+    dimensions = [getattr(summary_model, name) for name in group_by]
+
+    query = select(*dimensions, func.sum(getattr(summary_model, "jumlah")))
+    if start_date:
+        query = query.where(tanggal >= parse_date(start_date))
+    if end_date:
+        query = query.where(tanggal <= parse_date(end_date))
+    for name, value in equals.items():
+        if value:
+            query = query.where(getattr(summary_model, name) == value)
+    query = query.group_by(*dimensions).order_by(*dimensions)
+
+    result = await db.execute(query)
+    return [
+        {
+            **{
+                name: value.isoformat() if isinstance(value, date) else value
+                for name, value in zip(group_by, row[:-1])
+            },
+            "jumlah": int(row[-1]),
+        }
+        for row in result
+    ]
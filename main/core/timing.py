@@ -0,0 +1,110 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Adds a Server-Timing header splitting each request's time into pool
+# checkout, SQL execution and the rest. Meant for profiling, so off by default.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+
+@dataclass
+class RequestTiming:
+    checkout: float = 0.0
+    checkouts: int = 0
+    query: float = 0.0
+    queries: int = 0
+
+
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "current_timing", default=None
+)
+
+
+def record_checkout(seconds: float) -> None:
+    timing = current_timing.get()
+    if timing is not None:
+        timing.checkout += seconds
+        timing.checkouts += 1
+
+
+def instrument_queries(engine: Any) -> None:
+    """Add cursor execution time on a sync Engine or AsyncEngine to the request"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    # The start time lives on the statement's execution context, which is
+    # dropped with it, so nothing is left behind on the pooled connection
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before(
+        conn: Any, cursor: Any, statement: Any, params: Any, context: Any, *_: Any
+    ) -> None:
+        if current_timing.get() is not None and context is not None:
+            context._query_started = time.perf_counter()
+
+    def finished(context: Any) -> None:
+        timing = current_timing.get()
+        started = getattr(context, "_query_started", None)
+        if timing is not None and started is not None:
+            # Errors while fetching rows come after after_cursor_execute
+            context._query_started = None
+            timing.query += time.perf_counter() - started
+            timing.queries += 1
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after(
+        conn: Any, cursor: Any, statement: Any, params: Any, context: Any, *_: Any
+    ) -> None:
+        finished(context)
+
+    # after_cursor_execute does not fire for a statement that raises
+    @event.listens_for(sync_engine, "handle_error")
+    def failed(exception_context: Any) -> None:
+        finished(exception_context.execution_context)
+
+
+def server_timing(timing: RequestTiming, total: float) -> str:
+    return ", ".join(
+        [
+            f'db-checkout;dur={timing.checkout * 1000:.2f};desc="{timing.checkouts} checkouts"',
+            f'db-query;dur={timing.query * 1000:.2f};desc="{timing.queries} queries"',
+            f"total;dur={total * 1000:.2f}",
+        ]
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Collects RequestTiming for each request and reports it in Server-Timing.
+    Time spent after the response headers are sent (streamed bodies) is not
+    included.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not SERVER_TIMING:
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                header = server_timing(timing, time.perf_counter() - start)
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", header.encode()),
+                ]
+            await send(message)
+
+        token = current_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timing.reset(token)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+
+from core.db import async_engine, async_session_factory
+from core.metrics import CACHE_LOOKUPS
+from core.replicas import read_engine
+from core.ttl_cache import TTLCache
+from schema.url_schema import URL
+
+logger = logging.getLogger(__name__)
+
+# Codes never change once created, so found URLs can be kept for a long time
+URL_CACHE_TTL = int(os.getenv("URL_CACHE_TTL", "86400"))
+URL_CACHE_MAXSIZE = int(os.getenv("URL_CACHE_MAXSIZE", "10000"))
+# Unknown codes are remembered briefly so guessing/scanning stays off the DB
+URL_NEGATIVE_TTL = int(os.getenv("URL_NEGATIVE_TTL", "60"))
+REDIS_PREFIX = "url:code:"
+
+# Cached marker for a code that does not exist
+MISSING = ""
+
+
+class UrlResolver:
+    """
+    Read-through cache for code -> URL lookups: in-process LRU, then Redis,
+    then Postgres. Concurrent misses for the same code in one worker share a
+    single lookup.
+    """
+
+    def __init__(self) -> None:
+        self.local: TTLCache[str] = TTLCache(
+            maxsize=URL_CACHE_MAXSIZE, ttl=URL_CACHE_TTL
+        )
+        self._inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    async def _from_redis(self, redis: Any, code: str) -> Optional[str]:
+        if redis is None:
+            return None
+        try:
+            value = await redis.get(REDIS_PREFIX + code)
+        except RedisError as e:
+            logger.error(f"URL cache lookup failed: {e}")
+            return None
+        return None if value is None else value.decode()
+
+    async def _to_redis(self, redis: Any, code: str, url: str) -> None:
+        if redis is None:
+            return
+        ttl = URL_CACHE_TTL if url else URL_NEGATIVE_TTL
+        try:
+            await redis.set(REDIS_PREFIX + code, url.encode(), ex=ttl)
+        except RedisError as e:
+            logger.error(f"URL cache store failed: {e}")
+
+    async def _from_db(self, engine: AsyncEngine, code: str) -> Optional[str]:
+        async with async_session_factory(bind=engine) as db:
+            result = await db.execute(select(URL.url).where(URL.url_code == code))
+            return result.scalar_one_or_none()
+
+    async def _load(self, redis: Any, code: str) -> str:
+        url = await self._from_redis(redis, code)
+        if url is None:
+            engine = read_engine()
+            url = await self._from_db(engine, code)
+            if url is None and engine is not async_engine:
+                # Possibly created after the replica's last replay
+                url = await self._from_db(async_engine, code)
+            url = url or MISSING
+            await self._to_redis(redis, code, url)
+
+        self.local.set(code, url, ttl=URL_CACHE_TTL if url else URL_NEGATIVE_TTL)
+        return url
+
+    async def resolve(self, redis: Any, code: str) -> Optional[str]:
+        """The URL for `code`, or None if there is no such code"""
+        url = self.local.get(code)
+        CACHE_LOOKUPS.labels("url", "miss" if url is None else "hit").inc()
+        if url is None:
+            inflight = self._inflight.get(code)
+            if inflight is None:
+                inflight = asyncio.ensure_future(self._load(redis, code))
+                self._inflight[code] = inflight
+                inflight.add_done_callback(lambda _: self._inflight.pop(code, None))
+            url = await asyncio.shield(inflight)
+        return url or None
+
+    async def forget(self, redis: Any, code: str) -> None:
+        """Drop any cached answer for `code`, e.g. after creating it"""
+        self.local.invalidate(code)
+        if redis is None:
+            return
+        try:
+            await redis.delete(REDIS_PREFIX + code)
+        except RedisError as e:
+            logger.error(f"URL cache invalidation failed: {e}")
+
+
+url_resolver = UrlResolver()
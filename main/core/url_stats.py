@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core.db import async_session_factory
+from schema.url_schema import URLStats
+
+logger = logging.getLogger(__name__)
+
+# How often each worker writes its accumulated hits to the stats table
+FLUSH_SECONDS = float(os.getenv("URL_STATS_FLUSH_SECONDS", "10"))
+
+
+class HitCounter:
+    """
+    Per-worker hit counts for short codes. Redirects only bump a dict entry;
+    run() periodically folds the totals into rec_shorten_url_stats with one
+    upsert, so the stats table lags by at most FLUSH_SECONDS.
+    """
+
+    def __init__(self) -> None:
+        self._hits: Dict[str, Tuple[int, datetime]] = {}
+
+    def record(self, code: str) -> None:
+        hits, _ = self._hits.get(code, (0, None))
+        self._hits[code] = (hits + 1, datetime.now())
+
+    async def flush(self) -> int:
+        """Write pending hits; returns the number of codes written"""
+        # Swap before the first await so hits recorded meanwhile go to the new dict
+        pending, self._hits = self._hits, {}
+        if not pending:
+            return 0
+
+        stmt = pg_insert(URLStats).values(
+            # Sorted so concurrent flushes from other workers lock rows in order
+            [
+                {"url_code": code, "hits": hits, "last_accessed": last_accessed}
+                for code, (hits, last_accessed) in sorted(pending.items())
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["url_code"],
+            set_={
+                "hits": URLStats.hits + stmt.excluded.hits,
+                "last_accessed": func.greatest(
+                    URLStats.last_accessed, stmt.excluded.last_accessed
+                ),
+            },
+        )
+        try:
+            async with async_session_factory() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception:
+            # Put the counts back so the next flush retries them
+            for code, (hits, last_accessed) in pending.items():
+                newer, latest = self._hits.get(code, (0, last_accessed))
+                self._hits[code] = (hits + newer, max(latest, last_accessed))
+            raise
+        return len(pending)
+
+    async def run(self) -> None:
+        """Flush every FLUSH_SECONDS; shutdown should call flush() once more"""
+        while True:
+            await asyncio.sleep(FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush URL hit counts: {e}")
+
+
+hit_counter = HitCounter()
@@ -1,41 +1,36 @@
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 from core.auth import verify_read_permission, verify_write_permission
-from core.db import get_db
-from fastapi import APIRouter, Depends, Form, HTTPException
-from schema.absen_pengajian_schema import AbsenPengajian, AbsenPengajianRead
-from sqlmodel import Session, and_, select
+from core.bulk import (
+    combine_tanggal,
+    describe_row_error,
+    read_bulk_rows,
+    split_batch_duplicates,
+)
+from core.db import get_async_db
+from core.export import ExportFormat, date_range_filters, export_rows
+from core.pagination import MAX_PAGE_SIZE, CountMode, paginate
+from core.replicas import get_read_db
+from core.summary import add_to_summary, parse_group_by, summarize
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
+from schema.absen_pengajian_schema import (
+    AbsenPengajian,
+    AbsenPengajianBulkItem,
+    AbsenPengajianRead,
+    AbsenPengajianSummary,
+)
+from schema.bulk_schema import BulkResponse, BulkRowResult
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+# Rollup dimensions besides the day
+SUMMARY_FIELDS = ["acara", "lokasi", "ranah", "detail_ranah"]
 
-async def check_duplicate_pengajian(
-    db: Session,
-    acara: str,
-    tanggal: datetime,
-    nama: str,
-    lokasi: str,
-    ranah: str,
-    detail_ranah: str,
-) -> bool:
-    # Get the time window (2 hours before and after current time)
-    time_window_start = tanggal - timedelta(hours=2)
-    time_window_end = tanggal + timedelta(hours=2)
-
-    # Query for duplicates within time window
-    query = select(AbsenPengajian).where(
-        AbsenPengajian.acara == acara,
-        AbsenPengajian.nama == nama,
-        AbsenPengajian.lokasi == lokasi,
-        AbsenPengajian.ranah == ranah,
-        AbsenPengajian.detail_ranah == detail_ranah,
-        AbsenPengajian.tanggal >= time_window_start,
-        AbsenPengajian.tanggal <= time_window_end,
-    )
-
-    result = db.exec(query).first()
-    return result is not None
+# Columns that identify the same person checking in to the same event
+DEDUP_FIELDS = ["acara", "nama", "lokasi", "ranah", "detail_ranah"]
 
 
 @router.post(
@@ -51,6 +46,7 @@ async def create_absen(
     lokasi: str = Form(),
     ranah: str = Form(),
     detail_ranah: str = Form(),
+    db: AsyncSession = Depends(get_async_db),
 ):
     try:
         # Convert string date to datetime and add time component from jam_hadir
@@ -59,44 +55,41 @@ async def create_absen(
             tanggal_dt.date(), datetime.strptime(jam_hadir, "%H:%M").time()
         )
 
-        # Use the database session in a context manager
-        with get_db() as db:
-            # Check for duplicates
-            is_duplicate = await check_duplicate_pengajian(
-                db=db,
-                acara=acara,
-                tanggal=full_dt,
-                nama=nama,
-                lokasi=lokasi,
-                ranah=ranah,
-                detail_ranah=detail_ranah,
-            )
-
-            if is_duplicate:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Duplicate entry detected: Similar attendance record exists within 2 hours",
-                )
+        # Create AbsenPengajian instance
+        db_absen = AbsenPengajian(
+            acara=acara,
+            tanggal=full_dt,
+            jam_hadir=jam_hadir,
+            nama=nama,
+            lokasi=lokasi,
+            ranah=ranah,
+            detail_ranah=detail_ranah,
+        )
 
-            # Create AbsenPengajian instance
-            db_absen = AbsenPengajian(
-                acara=acara,
-                tanggal=full_dt,
-                jam_hadir=jam_hadir,
-                nama=nama,
-                lokasi=lokasi,
-                ranah=ranah,
-                detail_ranah=detail_ranah,
+        # One statement: the exclusion constraint rejects duplicates atomically
+        inserted = await db.execute(
+            pg_insert(AbsenPengajian)
+            .values(db_absen.model_dump(exclude={"id"}))
+            .on_conflict_do_nothing()
+            .returning(AbsenPengajian)
+        )
+        created = inserted.scalars().first()
+        if created is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Duplicate entry detected: Similar attendance record exists within 2 hours",
             )
-
-            db.add(db_absen)
-            db.commit()
-            db.refresh(db_absen)
-            # Create a copy of the data before session closes
-            result = AbsenPengajianRead.model_validate(db_absen)
+        # Create a copy of the data before the commit expires it
+        result = AbsenPengajianRead.model_validate(created)
+        await add_to_summary(
+            db, AbsenPengajianSummary, SUMMARY_FIELDS, [db_absen.model_dump()]
+        )
+        await db.commit()
 
         return result
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=422,
@@ -106,6 +99,134 @@ async def create_absen(
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkResponse,
+    dependencies=[Depends(verify_write_permission)],
+)
+async def create_absen_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Record many check-ins at once from a JSON array or NDJSON body.
+    Rows that duplicate an existing record, or an earlier row in the batch,
+    within 2 hours are skipped.
+    """
+    try:
+        rows = await read_bulk_rows(request)
+
+        results: Dict[int, BulkRowResult] = {}
+        candidates: List[Dict[str, Any]] = []
+        for index, raw in enumerate(rows):
+            try:
+                item = AbsenPengajianBulkItem.model_validate(raw)
+                full_dt = combine_tanggal(item.tanggal, item.jam_hadir)
+            except ValueError as e:
+                results[index] = BulkRowResult(
+                    index=index, status="invalid", detail=describe_row_error(e)
+                )
+                continue
+            candidates.append(
+                {
+                    **item.model_dump(),
+                    "idx": index,
+                    "tanggal": full_dt,
+                    "jam_hadir": full_dt.strftime("%H:%M"),
+                }
+            )
+
+        survivors, batch_duplicates = split_batch_duplicates(candidates, DEDUP_FIELDS)
+        for row in batch_duplicates:
+            results[row["idx"]] = BulkRowResult(
+                index=row["idx"], status="duplicate", detail="Duplicate within batch"
+            )
+
+        if survivors:
+            created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            # Rows that clash with an existing record are skipped by the
+            # exclusion constraint and simply don't come back from RETURNING
+            inserted = await db.execute(
+                pg_insert(AbsenPengajian)
+                .values(
+                    [
+                        {key: value for key, value in row.items() if key != "idx"}
+                        | {"created_at": created_at}
+                        for row in survivors
+                    ]
+                )
+                .on_conflict_do_nothing()
+                .returning(
+                    AbsenPengajian.id,
+                    *[getattr(AbsenPengajian, field) for field in DEDUP_FIELDS],
+                    AbsenPengajian.tanggal,
+                )
+            )
+            new_ids = {tuple(row[1:]): row[0] for row in inserted.all()}
+
+            created_rows = []
+            for row in survivors:
+                new_id = new_ids.get(
+                    tuple(row[key] for key in [*DEDUP_FIELDS, "tanggal"])
+                )
+                if new_id is None:
+                    results[row["idx"]] = BulkRowResult(
+                        index=row["idx"], status="duplicate", detail="Existing record"
+                    )
+                else:
+                    results[row["idx"]] = BulkRowResult(
+                        index=row["idx"], status="created", id=new_id
+                    )
+                    created_rows.append(row)
+
+            await add_to_summary(
+                db, AbsenPengajianSummary, SUMMARY_FIELDS, created_rows
+            )
+            await db.commit()
+
+        ordered = [results[index] for index in range(len(rows))]
+        return BulkResponse(
+            created=sum(1 for r in ordered if r.status == "created"),
+            duplicate=sum(1 for r in ordered if r.status == "duplicate"),
+            invalid=sum(1 for r in ordered if r.status == "invalid"),
+            results=ordered,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+
+def absen_filters(
+    tanggal: Optional[str],
+    acara: Optional[str],
+    lokasi: Optional[str],
+) -> List[Any]:
+    """WHERE clauses for the list filters"""
+    filters: List[Any] = []
+
+    if tanggal:
+        try:
+            # Convert string date to datetime for comparison
+            filter_date = datetime.strptime(tanggal, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="Invalid date format. Date should be YYYY-MM-DD",
+            )
+        # Compare only the date part
+        filters.append(AbsenPengajian.tanggal >= filter_date)
+        filters.append(AbsenPengajian.tanggal < filter_date + timedelta(days=1))
+
+    if acara:
+        filters.append(AbsenPengajian.acara == acara)
+
+    if lokasi:
+        filters.append(AbsenPengajian.lokasi == lokasi)
+
+    return filters
+
+
 @router.get(
     "/",
     response_model=List[AbsenPengajianRead],
@@ -115,39 +236,94 @@ async def list_absen(
     tanggal: Optional[str] = None,
     acara: Optional[str] = None,
     lokasi: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    count: Optional[CountMode] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
+    """
+    Check-ins ordered by (tanggal, id); all of them unless `limit` or `cursor`
+    is given. With `limit`, pass the X-Next-Cursor response header back as
+    `cursor` for the next page.
+    `fields` is a comma-separated subset of columns to return, and
+    `count=estimate|exact` adds X-Total-Count for the filtered rows.
+    """
     try:
-        with get_db() as db:
-            query = select(AbsenPengajian)
-
-            # Apply filters if parameters are provided
-            if tanggal:
-                try:
-                    # Convert string date to datetime for comparison
-                    filter_date = datetime.strptime(tanggal, "%Y-%m-%d")
-                    # Compare only the date part
-                    query = query.filter(
-                        and_(
-                            AbsenPengajian.tanggal >= filter_date,
-                            AbsenPengajian.tanggal < filter_date + timedelta(days=1),
-                        )
-                    )
-                except ValueError:
-                    raise HTTPException(
-                        status_code=422,
-                        detail="Invalid date format. Date should be YYYY-MM-DD",
-                    )
+        filters = absen_filters(tanggal, acara, lokasi)
+        return await paginate(
+            db,
+            AbsenPengajian,
+            AbsenPengajianRead,
+            filters,
+            limit=limit,
+            cursor=cursor,
+            fields=fields,
+            count=count,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
-            if acara:
-                query = query.filter(and_(AbsenPengajian.acara == acara))
 
-            if lokasi:
-                query = query.filter(and_(AbsenPengajian.lokasi == lokasi))
+@router.get("/export", dependencies=[Depends(verify_read_permission)])
+async def export_absen(
+    request: Request,
+    export_format: ExportFormat = Query("csv", alias="format"),
+    tanggal: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    acara: Optional[str] = None,
+    lokasi: Optional[str] = None,
+):
+    """
+    Stream check-ins as CSV or NDJSON. Takes the list filters plus an
+    inclusive start_date/end_date range (YYYY-MM-DD).
+    """
+    filters = absen_filters(tanggal, acara, lokasi)
+    filters += date_range_filters(AbsenPengajian.tanggal, start_date, end_date)
+    return export_rows(
+        request,
+        AbsenPengajian,
+        AbsenPengajianRead,
+        filters,
+        export_format,
+        "absen-pengajian",
+    )
 
-            absen_list = db.exec(query).all()
-            # Convert to response model to ensure we have all data before session closes
-            result = [AbsenPengajianRead.model_validate(absen) for absen in absen_list]
-        return result
+
+@router.get(
+    "/summary",
+    response_model=List[Dict[str, Any]],
+    dependencies=[Depends(verify_read_permission)],
+)
+async def summary_absen(
+    group_by: str = "tanggal,acara",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    acara: Optional[str] = None,
+    lokasi: Optional[str] = None,
+    ranah: Optional[str] = None,
+    detail_ranah: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Check-in counts ("jumlah") grouped by any of tanggal and SUMMARY_FIELDS,
+    served from the rollup table rather than the raw records.
+    """
+    try:
+        return await summarize(
+            db,
+            AbsenPengajianSummary,
+            parse_group_by(group_by, ["tanggal", *SUMMARY_FIELDS]),
+            start_date=start_date,
+            end_date=end_date,
+            acara=acara,
+            lokasi=lokasi,
+            ranah=ranah,
+            detail_ranah=detail_ranah,
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -159,14 +335,13 @@ async def list_absen(
     response_model=AbsenPengajianRead,
     dependencies=[Depends(verify_read_permission)],
 )
-async def get_absen(absen_id: int):
+async def get_absen(absen_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
-        with get_db() as db:
-            absen = db.get(AbsenPengajian, absen_id)
-            if absen is None:
-                raise HTTPException(status_code=404, detail="Absen record not found")
-            # Convert to response model before session closes
-            result = AbsenPengajianRead.model_validate(absen)
+        absen = await db.get(AbsenPengajian, absen_id)
+        if absen is None:
+            raise HTTPException(status_code=404, detail="Absen record not found")
+        # Convert to response model before session closes
+        result = AbsenPengajianRead.model_validate(absen)
         return result
     except HTTPException:
         raise
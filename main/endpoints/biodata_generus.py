@@ -1,46 +1,53 @@
 import json
 from datetime import date
-from typing import Optional
+from typing import Any, Optional
 
 from core.auth import verify_read_permission, verify_write_permission
-from core.db import get_db
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
-from fastapi_cache.decorator import cache
+from core.db import get_async_db
+from core.response_cache import ResponseCache, get_redis
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, Response
 from schema.biodata_generus_schema import (
     BiodataGenerusGetResponse,
     BiodataGenerusModel,
     BiodataGenerusResponse,
 )
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
 router = APIRouter()
 
 
+biodata_cache = ResponseCache("biodata-generus", ttl=300)
+
+LIST_FIELDS = list(BiodataGenerusGetResponse.model_fields)
+
+
+async def load_biodata_list(db: AsyncSession) -> bytes:
+    """Serialize the listing straight from the selected columns"""
+    query = select(*[getattr(BiodataGenerusModel, name) for name in LIST_FIELDS])
+    rows = (await db.execute(query)).all()
+    records = [dict(zip(LIST_FIELDS, row)) for row in rows]
+    return json.dumps(records, separators=(",", ":")).encode()
+
+
 @router.get(
     "/",
     response_model=list[BiodataGenerusGetResponse],
     dependencies=[Depends(verify_read_permission)],
 )
-@cache(expire=300)  # Cache response for 5 minutes
-async def get_biodata():
+async def get_biodata(
+    db: AsyncSession = Depends(get_async_db), redis: Any = Depends(get_redis)
+):
     """
     Get all biodata entries for generus
     """
     try:
-        with get_db() as db:
-            # updated deprecated query syntax
-            biodata = db.exec(select(BiodataGenerusModel)).all()
-            result = [
-                BiodataGenerusGetResponse(
-                    nama_lengkap=data.nama_lengkap,
-                    nama_panggilan=data.nama_panggilan,
-                    sambung_desa=data.sambung_desa,
-                    sambung_kelompok=data.sambung_kelompok,
-                    jenis_kelamin=data.jenis_kelamin,
-                )
-                for data in biodata
-            ]
-            return result
+        body, status = await biodata_cache.get_or_compute(
+            redis, lambda: load_biodata_list(db)
+        )
+        return Response(
+            content=body, media_type="application/json", headers={"X-Cache": status}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error retrieving biodata: {str(e)}"
@@ -73,6 +80,8 @@ async def create_biodata(
     nomor_hape_ibu: Optional[str] = Form(None),
     jenis_kelamin: Optional[str] = Form(None),
     daerah: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
+    redis: Any = Depends(get_redis),
 ):
     """
     Create a new biodata entry for generus
@@ -172,34 +181,34 @@ async def create_biodata(
         else:  # hobi is str
             hobi_dict = json.loads(hobi) if hobi else None
 
-        with get_db() as db:
-            # Create biodata model
-            biodata = BiodataGenerusModel(
-                nama_lengkap=nama_lengkap,
-                nama_panggilan=nama_panggilan,
-                kelahiran_tempat=kelahiran_tempat,
-                kelahiran_tanggal=kelahiran_tanggal,
-                alamat_tinggal=alamat_tinggal,
-                pendataan_tanggal=pendataan_tanggal,
-                sambung_desa=sambung_desa,
-                sambung_kelompok=sambung_kelompok,
-                hobi=hobi_dict,
-                sekolah_kelas=sekolah_kelas,
-                nomor_hape=nomor_hape,
-                nama_ayah=nama_ayah,
-                nama_ibu=nama_ibu,
-                status_ayah=status_ayah,
-                status_ibu=status_ibu,
-                nomor_hape_ayah=nomor_hape_ayah,
-                nomor_hape_ibu=nomor_hape_ibu,
-                jenis_kelamin=jenis_kelamin,
-                daerah=daerah,
-            )
+        # Create biodata model
+        biodata = BiodataGenerusModel(
+            nama_lengkap=nama_lengkap,
+            nama_panggilan=nama_panggilan,
+            kelahiran_tempat=kelahiran_tempat,
+            kelahiran_tanggal=kelahiran_tanggal,
+            alamat_tinggal=alamat_tinggal,
+            pendataan_tanggal=pendataan_tanggal,
+            sambung_desa=sambung_desa,
+            sambung_kelompok=sambung_kelompok,
+            hobi=hobi_dict,
+            sekolah_kelas=sekolah_kelas,
+            nomor_hape=nomor_hape,
+            nama_ayah=nama_ayah,
+            nama_ibu=nama_ibu,
+            status_ayah=status_ayah,
+            status_ibu=status_ibu,
+            nomor_hape_ayah=nomor_hape_ayah,
+            nomor_hape_ibu=nomor_hape_ibu,
+            jenis_kelamin=jenis_kelamin,
+            daerah=daerah,
+        )
 
-            db.add(biodata)
-            db.commit()
-            db.refresh(biodata)
-            result = BiodataGenerusResponse.model_validate(biodata)
+        db.add(biodata)
+        await db.commit()
+        await db.refresh(biodata)
+        result = BiodataGenerusResponse.model_validate(biodata)
+        await biodata_cache.invalidate(redis)
 
         return result
     except json.JSONDecodeError:
@@ -0,0 +1,43 @@
+from typing import Optional
+
+from core.conditional import Payload, conditional_response
+from core.reference_data import reference_data
+from fastapi import APIRouter, Request
+
+router = APIRouter()
+
+EMPTY = Payload.of([])
+
+
+@router.get("/")
+async def get_form_bootstrap(
+    request: Request,
+    acara: Optional[str] = None,
+    daerah: Optional[str] = None,
+    kategori: Optional[str] = None,
+    detail_kategori: Optional[str] = None,
+):
+    """
+    Every lookup a form needs in one document: sesi for `acara`, ranah for
+    `daerah`, materi for `kategori` (optionally `detail_kategori`), plus hobi
+    and kelas sekolah. Sections without context or without data are empty
+    lists. Supports If-None-Match like the individual endpoints.
+    """
+    snapshot = await reference_data.current()
+
+    materi = EMPTY
+    if kategori and detail_kategori:
+        materi = snapshot.materi_by_detail.get((kategori, detail_kategori), EMPTY)
+    elif kategori:
+        materi = snapshot.materi.get(kategori, EMPTY)
+
+    payload = Payload.compose(
+        {
+            "sesi": snapshot.sesi.get(acara, EMPTY) if acara else EMPTY,
+            "daerah": snapshot.daerah.get(daerah, EMPTY) if daerah else EMPTY,
+            "hobi": snapshot.hobi,
+            "kelas_sekolah": snapshot.kelas_sekolah,
+            "materi": materi,
+        }
+    )
+    return conditional_response(request, payload)
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from core.auth import auth_ready
+from core.db import check_database_health
+from core.response_cache import get_redis
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from tenacity import stop_after_attempt
+
+router = APIRouter()
+
+# Per-check limit, so a hung dependency fails the probe instead of stalling it
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "2"))
+
+
+async def _timed(check: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        ok = await asyncio.wait_for(check(), READINESS_TIMEOUT)
+        result: Dict[str, Any] = {"ok": ok is not False}
+    except Exception as e:
+        result = {"ok": False, "error": str(e) or type(e).__name__}
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the worker is up and its event loop is responding"""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(request: Request, redis: Any = Depends(get_redis)):
+    """
+    Readiness: startup (including pool warm-up) has finished and the
+    database, Redis and auth are usable. 503 until then.
+    """
+
+    async def database() -> bool:
+        # One attempt; the retrying default would hold the probe for seconds
+        return await check_database_health.retry_with(stop=stop_after_attempt(1))()
+
+    async def cache() -> bool:
+        if redis is None:
+            return False
+        return bool(await redis.ping())
+
+    async def auth() -> bool:
+        return auth_ready()
+
+    checks = dict(
+        zip(
+            ["database", "redis", "auth"],
+            await asyncio.gather(_timed(database), _timed(cache), _timed(auth)),
+        )
+    )
+    started = getattr(request.app.state, "ready", False)
+    ready = started and all(check["ok"] for check in checks.values())
+    return JSONResponse(
+        {"status": "ready" if ready else "not ready", "started": started, **checks},
+        status_code=200 if ready else 503,
+    )
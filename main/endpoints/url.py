@@ -1,37 +1,105 @@
-from typing import Optional
+import os
+from typing import Any, List, Optional
 
 from core.auth import verify_token
-from core.db import get_db_dependency
-from fastapi import APIRouter, Depends, Form, HTTPException
+from core.bulk import read_bulk_rows
+from core.db import get_async_db
+from core.replicas import get_read_db
+from core.response_cache import get_redis
+from core.short_codes import code_allocator
+from core.url_cache import url_resolver
+from core.url_stats import hit_counter
+from fastapi import APIRouter, Depends, Form, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse
 from fastapi_limiter.depends import RateLimiter
-from schema.url_schema import URL, URLResponse
-from sqlmodel import Session, select
+from schema.url_schema import URL, URLResponse, URLStats, URLStatsResponse
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+# 307 by default; 301 lets browsers cache the redirect for good
+REDIRECT_STATUS = int(os.getenv("URL_REDIRECT_STATUS", "307"))
+
+
+@router.get("/stats/top", response_model=List[URLStatsResponse])
+async def get_top_urls(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    _: str = Depends(verify_token),
+) -> List[URLStatsResponse]:
+    """Most-visited codes. Counts are flushed in batches, so they lag slightly."""
+    result = await db.execute(
+        select(URLStats.url_code, URL.url, URLStats.hits, URLStats.last_accessed)
+        .join(URL, URL.url_code == URLStats.url_code)
+        .order_by(URLStats.hits.desc())  # type: ignore
+        .limit(limit)
+    )
+    return [URLStatsResponse(**row._mapping) for row in result]
+
 
 @router.get("/{code}")
 async def get_url(
-    code: str, session: Session = Depends(get_db_dependency)
+    code: str,
+    redirect: bool = False,
+    redis: Any = Depends(get_redis),
 ) -> Optional[URLResponse]:
-    """Get the original URL for a given code."""
-    statement = select(URL).where(URL.url_code == code)
-    result = session.exec(statement).first()
-    if not result:
+    """
+    Get the original URL for a given code. With `redirect=true` the client is
+    sent straight there instead of receiving JSON.
+    """
+    url = await url_resolver.resolve(redis, code)
+    if url is None:
         raise HTTPException(status_code=404, detail="URL not found")
-    return URLResponse(url=result.url, url_code=result.url_code)
+    hit_counter.record(code)
+    if redirect:
+        return RedirectResponse(url, status_code=REDIRECT_STATUS)  # type: ignore
+    return URLResponse(url=url, url_code=code)
 
 
 @router.post("/")
-def create_url(
+async def create_url(
     url: str = Form(...),
-    session: Session = Depends(get_db_dependency),
+    db: AsyncSession = Depends(get_async_db),
+    redis: Any = Depends(get_redis),
     _: str = Depends(verify_token),
     _rate_limit: Optional[None] = Depends(
         RateLimiter(times=10, minutes=1)
     ),  # 10 requests per minute
 ) -> URLResponse:
     """Create a new shortened URL using form data."""
-    db_url = URL(url=url)
-    session.add(db_url)
-    return URLResponse(url=db_url.url, url_code=db_url.url_code)
+    (code,) = await code_allocator.allocate(db)
+    db.add(URL(url=url, url_code=code))
+    await db.commit()
+    # In case the code was looked up (and cached as unknown) before it existed
+    await url_resolver.forget(redis, code)
+    return URLResponse(url=url, url_code=code)
+
+
+@router.post("/bulk", response_model=List[URLResponse])
+async def create_url_bulk(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    _: str = Depends(verify_token),
+    _rate_limit: Optional[None] = Depends(
+        RateLimiter(times=10, minutes=1)
+    ),  # 10 requests per minute
+) -> List[URLResponse]:
+    """
+    Shorten many URLs at once from a JSON array (or NDJSON) of URL strings.
+    Codes are returned in input order.
+    """
+    urls = await read_bulk_rows(request)
+    if not all(isinstance(url, str) and url for url in urls):
+        raise HTTPException(
+            status_code=422, detail="Every row must be a non-empty URL string"
+        )
+    if not urls:
+        return []
+
+    codes = await code_allocator.allocate(db, len(urls))
+    await db.execute(
+        insert(URL), [{"url": url, "url_code": code} for url, code in zip(urls, codes)]
+    )
+    await db.commit()
+    return [URLResponse(url=url, url_code=code) for url, code in zip(urls, codes)]
@@ -1,10 +1,34 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
-from core.db import engine
+from core.auth import AUTH_NATIVE_JWT, init_auth, listen_for_revocations
+from core.db import (
+    POOL_SIZE,
+    async_engine,
+    check_schema_version,
+    engine,
+    replica_engines,
+    warm_up_pools,
+)
+from core.jwt_verifier import user_directory
+from core.metrics import (
+    InstrumentedRedis,
+    MetricsMiddleware,
+    instrument_pool,
+    mark_worker_dead,
+    metrics,
+)
+from core.pagination import PAGINATION_HEADERS
+from core.partitions import partition_maintainer
+from core.reference_data import reference_data
+from core.replicas import StickyPrimaryMiddleware, replica_router
+from core.startup import StartupTimer
+from core.timing import ServerTimingMiddleware, instrument_queries
+from core.url_stats import hit_counter
 from endpoints import (
     absen_asramaan,
     absen_pengajian,
@@ -13,40 +37,95 @@ from endpoints import (
     data_hobi,
     data_kelas_sekolah,
     data_materi,
+    form_bootstrap,
+    health,
     sesi,
     url,
 )
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_limiter import FastAPILimiter
-from redis import asyncio as aioredis
-from sqlmodel import SQLModel
 
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    timer = StartupTimer()
+    background_tasks = []
     try:
         app.state.startup_time = datetime.now()
-        # Create database tables
-        SQLModel.metadata.create_all(engine)
+        # Django (and the auth services built on it) is only set up here, not
+        # at import time
+        with timer.step("auth"):
+            init_auth()
+
+        # Tables are managed by Alembic; only check we are at its head
+        with timer.step("schema"):
+            await check_schema_version()
+
+        # Attendance partitions for the coming months exist before they are needed
+        with timer.step("partitions"):
+            try:
+                await partition_maintainer.maintain()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}")
+        background_tasks.append(asyncio.create_task(partition_maintainer.run()))
 
         # Initialize Redis using container name
-        redis = await aioredis.from_url(  # type: ignore
-            f"redis://{os.getenv('REDIS_CONTAINER_NAME', 'localhost')}:6379",
-            encoding="utf8",
-            decode_responses=False,
-        )
-        # Type ignore added to handle type checking issues
-        await FastAPILimiter.init(redis)  # type: ignore
-        FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+        with timer.step("redis"):
+            redis = InstrumentedRedis.from_url(
+                f"redis://{os.getenv('REDIS_CONTAINER_NAME', 'localhost')}:6379",
+                encoding="utf8",
+                decode_responses=False,
+            )
+            app.state.redis = redis
+            # Type ignore added to handle type checking issues
+            await FastAPILimiter.init(redis)  # type: ignore
+
+        # Open connections now rather than on the first requests
+        with timer.step("warm_up"):
+            await asyncio.gather(
+                warm_up_pools(), *(redis.ping() for _ in range(POOL_SIZE))
+            )
+
+        # Reads go to replicas that pass this check (if any are configured)
+        if replica_engines:
+            with timer.step("replicas"):
+                await replica_router.check()
+            background_tasks.append(asyncio.create_task(replica_router.run()))
+
+        # Keep the in-process auth cache in sync with revocations
+        background_tasks.append(asyncio.create_task(listen_for_revocations(redis)))
+
+        # Lookup tables are answered from memory
+        with timer.step("reference_data"):
+            await reference_data.refresh()
+        background_tasks.append(asyncio.create_task(reference_data.run(redis)))
+
+        # Short URL hits are counted in memory and written in batches
+        background_tasks.append(asyncio.create_task(hit_counter.run()))
+
+        # Bearer tokens are checked against an in-memory set of user ids
+        if AUTH_NATIVE_JWT:
+            with timer.step("user_directory"):
+                await user_directory.refresh()
+            background_tasks.append(asyncio.create_task(user_directory.run()))
+        timer.report()
+        # /readyz reports ready from here on
+        app.state.ready = True
     except Exception as e:
         logger.error(f"Startup error: {e}")
         raise
     yield
+    app.state.ready = False
+    for task in background_tasks:
+        task.cancel()
+    mark_worker_dead()
+    try:
+        await hit_counter.flush()
+    except Exception as e:
+        logger.error(f"Failed to flush URL hit counts: {e}")
     runtime = datetime.now() - app.state.startup_time
     logger.info(f"Application ran for {runtime}")
 
@@ -58,6 +137,17 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+instrument_pool(engine, "sync")
+instrument_pool(async_engine, "async")
+instrument_queries(engine)
+instrument_queries(async_engine)
+for index, replica in enumerate(replica_engines):
+    instrument_pool(replica, f"replica-{index}")
+    instrument_queries(replica)
+
+app.add_middleware(StickyPrimaryMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -68,7 +158,8 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["POST", "GET", "OPTIONS"],
-    allow_headers=["Authorization", "Content-Type"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=[*PAGINATION_HEADERS, "ETag", "X-Cache"],
 )
 
 routers = [
@@ -81,12 +172,18 @@ routers = [
     (data_materi.router, "/data/materi", ["data-materi"]),
     (data_hobi.router, "/data/hobi", ["data-hobi"]),
     (data_kelas_sekolah.router, "/data/kelas-sekolah", ["data-kelas-sekolah"]),
+    (form_bootstrap.router, "/data/bootstrap", ["form-bootstrap"]),
+    (health.router, "", ["health"]),
 ]
 
 for router, prefix, tags in routers:
     app.include_router(router, prefix=prefix, tags=[str(tag) for tag in tags])
 
 
+# Scraped by Prometheus on the app port; nginx does not forward it
+app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+
+
 @app.get("/")
 async def root():
     return {"error": "Invalid access. This endpoint is intended for API only."}
@@ -1,19 +1,20 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import ClassVar, Optional
 
 from pydantic import ConfigDict, field_validator
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class AbsenAsramaanBase(SQLModel):
-    acara: str = Field(index=True)
+    acara: str
     tanggal: datetime
     jam_hadir: str
-    nama: str = Field(index=True)
+    nama: str
     lokasi: str
     ranah: str
     detail_ranah: str
-    sesi: str = Field(index=True)  # Added sesi field
+    sesi: str  # Added sesi field
 
     @field_validator("jam_hadir")
     def validate_jam_hadir(cls, v: str) -> str:
@@ -26,10 +27,26 @@ class AbsenAsramaanBase(SQLModel):
 
 
 class AbsenAsramaan(AbsenAsramaanBase, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Keyset pagination order for the list endpoint, alone and after each
+        # of its equality filters
+        Index("ix_rec_absen_asramaan_tanggal_id", "tanggal", "id"),
+        Index("ix_rec_absen_asramaan_acara_tanggal_id", "acara", "tanggal", "id"),
+        Index("ix_rec_absen_asramaan_lokasi_tanggal_id", "lokasi", "tanggal", "id"),
+        Index("ix_rec_absen_asramaan_sesi_tanggal_id", "sesi", "tanggal", "id"),
+        # Monthly partitions, each with its own dedup exclusion constraint
+        # (same key, at most 2 hours apart), are managed by the migrations and
+        # core/partitions.py. The database primary key is (id, tanggal); ids
+        # are still unique, so the ORM keeps identifying rows by id alone.
+        {"extend_existing": True, "postgresql_partition_by": "RANGE (tanggal)"},
+    )
     __tablename__: ClassVar[str] = "rec_absen_asramaan"  # type: ignore
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Naive UTC: the column is TIMESTAMP WITHOUT TIME ZONE and asyncpg rejects
+    # aware datetimes for it
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
 
 
 class AbsenAsramaanCreate(AbsenAsramaanBase):
@@ -43,3 +60,29 @@ class AbsenAsramaanRead(AbsenAsramaanBase):
     model_config = ConfigDict(  # type: ignore
         json_encoders={datetime: lambda dt: dt.strftime("%Y-%m-%d")}
     )
+
+
+class AbsenAsramaanBulkItem(SQLModel):
+    acara: str
+    tanggal: str  # YYYY-MM-DD
+    jam_hadir: str  # HH:MM
+    nama: str
+    lokasi: str
+    ranah: str
+    detail_ranah: str
+    sesi: str
+
+
+class AbsenAsramaanSummary(SQLModel, table=True):
+    """Check-ins per day and group, kept up to date by the create endpoints"""
+
+    __table_args__ = {"extend_existing": True}
+    __tablename__: ClassVar[str] = "rec_absen_asramaan_summary"  # type: ignore
+
+    tanggal: date = Field(primary_key=True)
+    acara: str = Field(primary_key=True)
+    sesi: str = Field(primary_key=True)
+    lokasi: str = Field(primary_key=True)
+    ranah: str = Field(primary_key=True)
+    detail_ranah: str = Field(primary_key=True)
+    jumlah: int = 0
@@ -1,15 +1,16 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import ClassVar, Optional
 
 from pydantic import ConfigDict, field_validator
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class AbsenPengajianBase(SQLModel):
-    acara: str = Field(index=True)
+    acara: str
     tanggal: datetime
     jam_hadir: str
-    nama: str = Field(index=True)
+    nama: str
     lokasi: str
     ranah: str
     detail_ranah: str
@@ -25,10 +26,25 @@ class AbsenPengajianBase(SQLModel):
 
 
 class AbsenPengajian(AbsenPengajianBase, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Keyset pagination order for the list endpoint, alone and after each
+        # of its equality filters
+        Index("ix_rec_absen_pengajian_tanggal_id", "tanggal", "id"),
+        Index("ix_rec_absen_pengajian_acara_tanggal_id", "acara", "tanggal", "id"),
+        Index("ix_rec_absen_pengajian_lokasi_tanggal_id", "lokasi", "tanggal", "id"),
+        # Monthly partitions, each with its own dedup exclusion constraint
+        # (same key, at most 2 hours apart), are managed by the migrations and
+        # core/partitions.py. The database primary key is (id, tanggal); ids
+        # are still unique, so the ORM keeps identifying rows by id alone.
+        {"extend_existing": True, "postgresql_partition_by": "RANGE (tanggal)"},
+    )
     __tablename__: ClassVar[str] = "rec_absen_pengajian"  # type: ignore
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Naive UTC: the column is TIMESTAMP WITHOUT TIME ZONE and asyncpg rejects
+    # aware datetimes for it
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    )
 
 
 class AbsenPengajianCreate(AbsenPengajianBase):
@@ -42,3 +58,27 @@ class AbsenPengajianRead(AbsenPengajianBase):
     model_config = ConfigDict(  # type: ignore
         json_encoders={datetime: lambda dt: dt.strftime("%Y-%m-%d")}
     )
+
+
+class AbsenPengajianBulkItem(SQLModel):
+    acara: str
+    tanggal: str  # YYYY-MM-DD
+    jam_hadir: str  # HH:MM
+    nama: str
+    lokasi: str
+    ranah: str
+    detail_ranah: str
+
+
+class AbsenPengajianSummary(SQLModel, table=True):
+    """Check-ins per day and group, kept up to date by the create endpoints"""
+
+    __table_args__ = {"extend_existing": True}
+    __tablename__: ClassVar[str] = "rec_absen_pengajian_summary"  # type: ignore
+
+    tanggal: date = Field(primary_key=True)
+    acara: str = Field(primary_key=True)
+    lokasi: str = Field(primary_key=True)
+    ranah: str = Field(primary_key=True)
+    detail_ranah: str = Field(primary_key=True)
+    jumlah: int = 0
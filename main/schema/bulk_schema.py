@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+
+class BulkRowResult(SQLModel):
+    index: int
+    status: str  # "created", "duplicate" or "invalid"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkResponse(SQLModel):
+    created: int
+    duplicate: int
+    invalid: int
+    results: List[BulkRowResult]
@@ -1,13 +1,11 @@
-import random
-import string
+from datetime import datetime
 from typing import ClassVar, Optional
 
+from sqlalchemy import BigInteger, Column, Sequence
 from sqlmodel import Field, SQLModel
 
-
-def generate_code(length: int = 6) -> str:
-    characters = string.ascii_letters + string.digits
-    return "".join(random.choice(characters) for _ in range(length))
+# Source of short codes, see core.short_codes
+code_sequence = Sequence("rec_shorten_urls_code_seq", metadata=SQLModel.metadata)
 
 
 class URLBase(SQLModel):
@@ -18,7 +16,7 @@ class URL(URLBase, table=True):
     __table_args__ = {"extend_existing": True}
     __tablename__: ClassVar[str] = "rec_shorten_urls"  # type: ignore
     id: Optional[int] = Field(default=None, primary_key=True)
-    url_code: str = Field(default_factory=lambda: generate_code(), unique=True)
+    url_code: str = Field(unique=True)
 
 
 class URLResponse(URLBase):
@@ -27,3 +25,18 @@ class URLResponse(URLBase):
 
 class URLCreate(URLBase):
     pass
+
+
+class URLStats(SQLModel, table=True):
+    """Redirect counts per code, written in batches by core.url_stats"""
+
+    __table_args__ = {"extend_existing": True}
+    __tablename__: ClassVar[str] = "rec_shorten_url_stats"  # type: ignore
+    url_code: str = Field(primary_key=True)
+    hits: int = Field(default=0, sa_column=Column(BigInteger, nullable=False))
+    last_accessed: datetime
+
+
+class URLStatsResponse(URLResponse):
+    hits: int
+    last_accessed: datetime
@@ -241,6 +241,9 @@ def run_migrations_online() -> None:
 
         # Check for existing tables
         existing_tables = check_existing_tables(connection)
+        # The inspector autobegins a transaction; end it so that Alembic's
+        # begin_transaction() below owns (and commits) the migration
+        connection.commit()
 
         context.configure(
             connection=connection,
@@ -285,5 +288,5 @@ def run_migrations() -> None:
         raise
 
 
-if __name__ == "__main__":
-    run_migrations()
+# Alembic loads env.py as a module rather than running it as a script
+run_migrations()
@@ -0,0 +1,164 @@
+"""baseline schema
+
+Revision ID: 03beeab781b5
+Revises:
+Create Date: 2026-10-17 12:40:00.000000
+
+Tables as previously created by SQLModel.metadata.create_all. Tables that
+already exist are left untouched, so existing databases can be upgraded
+in place.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "03beeab781b5"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _missing(table_name: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def upgrade() -> None:
+    if _missing("rec_absen_pengajian"):
+        op.create_table(
+            "rec_absen_pengajian",
+            sa.Column("acara", sa.String(), nullable=False),
+            sa.Column("tanggal", sa.DateTime(), nullable=False),
+            sa.Column("jam_hadir", sa.String(), nullable=False),
+            sa.Column("nama", sa.String(), nullable=False),
+            sa.Column("lokasi", sa.String(), nullable=False),
+            sa.Column("ranah", sa.String(), nullable=False),
+            sa.Column("detail_ranah", sa.String(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_rec_absen_pengajian_acara", "rec_absen_pengajian", ["acara"]
+        )
+        op.create_index("ix_rec_absen_pengajian_nama", "rec_absen_pengajian", ["nama"])
+
+    if _missing("rec_absen_asramaan"):
+        op.create_table(
+            "rec_absen_asramaan",
+            sa.Column("acara", sa.String(), nullable=False),
+            sa.Column("tanggal", sa.DateTime(), nullable=False),
+            sa.Column("jam_hadir", sa.String(), nullable=False),
+            sa.Column("nama", sa.String(), nullable=False),
+            sa.Column("lokasi", sa.String(), nullable=False),
+            sa.Column("ranah", sa.String(), nullable=False),
+            sa.Column("detail_ranah", sa.String(), nullable=False),
+            sa.Column("sesi", sa.String(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_rec_absen_asramaan_acara", "rec_absen_asramaan", ["acara"])
+        op.create_index("ix_rec_absen_asramaan_nama", "rec_absen_asramaan", ["nama"])
+        op.create_index("ix_rec_absen_asramaan_sesi", "rec_absen_asramaan", ["sesi"])
+
+    if _missing("data_biodata_generus"):
+        op.create_table(
+            "data_biodata_generus",
+            sa.Column("nama_lengkap", sa.String(), nullable=False),
+            sa.Column("nama_panggilan", sa.String(), nullable=False),
+            sa.Column("kelahiran_tempat", sa.String(), nullable=False),
+            sa.Column("kelahiran_tanggal", sa.Date(), nullable=False),
+            sa.Column("alamat_tinggal", sa.String(), nullable=False),
+            sa.Column("pendataan_tanggal", sa.Date(), nullable=False),
+            sa.Column("sambung_desa", sa.String(), nullable=False),
+            sa.Column("sambung_kelompok", sa.String(), nullable=False),
+            sa.Column("hobi", sa.JSON(), nullable=True),
+            sa.Column("sekolah_kelas", sa.String(), nullable=False),
+            sa.Column("nomor_hape", sa.String(), nullable=True),
+            sa.Column("nama_ayah", sa.String(), nullable=False),
+            sa.Column("nama_ibu", sa.String(), nullable=False),
+            sa.Column("status_ayah", sa.String(), nullable=False),
+            sa.Column("status_ibu", sa.String(), nullable=False),
+            sa.Column("nomor_hape_ayah", sa.String(), nullable=True),
+            sa.Column("nomor_hape_ibu", sa.String(), nullable=True),
+            sa.Column("jenis_kelamin", sa.String(), nullable=False),
+            sa.Column("daerah", sa.String(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if _missing("data_daerah"):
+        op.create_table(
+            "data_daerah",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("daerah", sa.String(), nullable=False),
+            sa.Column("ranah", sa.String(), nullable=False),
+            sa.Column("detail_ranah", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_data_daerah_daerah", "data_daerah", ["daerah"])
+
+    if _missing("data_hobi"):
+        op.create_table(
+            "data_hobi",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("kategori", sa.String(), nullable=False),
+            sa.Column("hobi", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_data_hobi_kategori", "data_hobi", ["kategori"])
+
+    if _missing("data_kelas_sekolah"):
+        op.create_table(
+            "data_kelas_sekolah",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("jenjang", sa.String(), nullable=False),
+            sa.Column("kelas", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if _missing("data_materi"):
+        op.create_table(
+            "data_materi",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("kategori", sa.String(), nullable=False),
+            sa.Column("detail_kategori", sa.String(), nullable=False),
+            sa.Column("materi", sa.String(), nullable=False),
+            sa.Column("detail_materi", sa.String(), nullable=False),
+            sa.Column("indikator", sa.String(), nullable=False),
+            sa.Column("indikator_mulai", sa.String(), nullable=False),
+            sa.Column("indikator_akhir", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_data_materi_kategori", "data_materi", ["kategori"])
+
+    if _missing("data_sesi"):
+        op.create_table(
+            "data_sesi",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("acara", sa.String(), nullable=False),
+            sa.Column("sesi", sa.String(), nullable=False),
+            sa.Column("waktu", sa.Time(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_data_sesi_acara", "data_sesi", ["acara"])
+        op.create_index("ix_data_sesi_sesi", "data_sesi", ["sesi"])
+
+    if _missing("rec_shorten_urls"):
+        op.create_table(
+            "rec_shorten_urls",
+            sa.Column("url", sa.String(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("url_code", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("url_code"),
+        )
+
+
+def downgrade() -> None:
+    # The baseline predates migrations; dropping it would drop all data.
+    pass
@@ -0,0 +1,99 @@
+"""absen dedup exclusion constraints
+
+Revision ID: 223ff4c8e901
+Revises: 03beeab781b5
+Create Date: 2026-10-17 12:45:00.000000
+
+Enforce the "same person, same event, within 2 hours" rule in the database.
+Each row covers [tanggal - 1h, tanggal + 1h]; two rows with equal key columns
+conflict when those ranges overlap, i.e. when they are at most 2 hours
+apart, which is exactly the window the old SELECT-then-INSERT check used.
+
+Rows that the racy application check let through would block the
+constraint, so they are removed first: walking in id order, a row is
+dropped when it clashes with an earlier row that is being kept. That is done
+in rounds of one set-based DELETE each, removing the rows that clash with an
+earlier row which itself clashes with nothing before it, until a round
+removes nothing; the number of rounds is the length of the longest chain of
+clashing check-ins, usually one or two. Removed rows are moved to
+{table}_dedup_removed, which downgrade leaves in place, and the count is
+logged.
+"""
+
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision: str = "223ff4c8e901"
+down_revision: Union[str, None] = "03beeab781b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.migration")
+
+DEDUP_COLUMNS = {
+    "rec_absen_pengajian": ["acara", "nama", "lokasi", "ranah", "detail_ranah"],
+    "rec_absen_asramaan": ["acara", "nama", "lokasi", "ranah", "detail_ranah", "sesi"],
+}
+
+WINDOW = "tsrange(tanggal - interval '1 hour', tanggal + interval '1 hour', '[]')"
+
+
+def _clash(
+    table: str, columns: Sequence[str], earlier: str, later: str, also: str = ""
+) -> str:
+    """Whether `later` clashes with an earlier row, aliased `earlier`"""
+    matches = " AND ".join(f"{earlier}.{c} = {later}.{c}" for c in columns)
+    return f"""
+        EXISTS (
+            SELECT 1 FROM {table} AS {earlier}
+            WHERE {matches}
+              AND {earlier}.id < {later}.id
+              AND {earlier}.tanggal BETWEEN {later}.tanggal - interval '2 hours'
+                                      AND {later}.tanggal + interval '2 hours'
+              {also}
+        )
+    """
+
+
+def upgrade() -> None:
+    # Lets plain equality columns take part in a GiST exclusion constraint
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    for table, columns in DEDUP_COLUMNS.items():
+        archive = f"{table}_dedup_removed"
+        op.execute(f"CREATE TABLE IF NOT EXISTS {archive} (LIKE {table})")
+        # A row that clashes with nothing before it is kept, so the rows that
+        # clash with one of those go; repeat until nothing is left to remove
+        kept = f"NOT {_clash(table, columns, 'earlier', 'kept')}"
+        duplicate = _clash(table, columns, "kept", "later", f"AND {kept}")
+        move = f"""
+            WITH removed AS (
+                DELETE FROM {table} AS later
+                WHERE {duplicate}
+                RETURNING later.*
+            )
+            INSERT INTO {archive} SELECT * FROM removed
+            """
+        removed = 0
+        while True:
+            round_removed = op.get_bind().execute(text(move)).rowcount
+            if not round_removed:
+                break
+            removed += round_removed
+        logger.info(f"Moved {removed} duplicate rows from {table} to {archive}")
+
+        elements = ", ".join(f"{c} WITH =" for c in columns)
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD CONSTRAINT ex_{table}_dedup
+            EXCLUDE USING gist ({elements}, {WINDOW} WITH &&)
+            """)
+
+
+def downgrade() -> None:
+    for table in DEDUP_COLUMNS:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS ex_{table}_dedup")
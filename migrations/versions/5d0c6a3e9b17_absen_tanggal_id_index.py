@@ -0,0 +1,29 @@
+"""absen tanggal id index
+
+Revision ID: 5d0c6a3e9b17
+Revises: 223ff4c8e901
+Create Date: 2026-10-17 14:10:00.000000
+
+Composite (tanggal, id) index backing keyset pagination on the absen list
+endpoints, so each page is an index range scan instead of a sort.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d0c6a3e9b17"
+down_revision: Union[str, None] = "223ff4c8e901"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ["rec_absen_pengajian", "rec_absen_asramaan"]:
+        op.create_index(f"ix_{table}_tanggal_id", table, ["tanggal", "id"])
+
+
+def downgrade() -> None:
+    for table in ["rec_absen_pengajian", "rec_absen_asramaan"]:
+        op.drop_index(f"ix_{table}_tanggal_id", table_name=table)
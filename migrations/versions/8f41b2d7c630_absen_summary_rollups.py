@@ -0,0 +1,51 @@
+"""absen summary rollups
+
+Revision ID: 8f41b2d7c630
+Revises: 5d0c6a3e9b17
+Create Date: 2026-10-17 15:05:00.000000
+
+Per-day check-in counts for the /summary endpoints. The create endpoints
+keep them current from here on; existing records are counted once during
+the upgrade.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "8f41b2d7c630"
+down_revision: Union[str, None] = "5d0c6a3e9b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SUMMARY_COLUMNS = {
+    "rec_absen_pengajian": ["acara", "lokasi", "ranah", "detail_ranah"],
+    "rec_absen_asramaan": ["acara", "sesi", "lokasi", "ranah", "detail_ranah"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in SUMMARY_COLUMNS.items():
+        op.create_table(
+            f"{table}_summary",
+            sa.Column("tanggal", sa.Date(), nullable=False),
+            *[sa.Column(column, sa.String(), nullable=False) for column in columns],
+            sa.Column("jumlah", sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint("tanggal", *columns),
+        )
+
+        # Backfill from the records already there
+        column_list = ", ".join(columns)
+        op.execute(f"""
+            INSERT INTO {table}_summary (tanggal, {column_list}, jumlah)
+            SELECT tanggal::date, {column_list}, count(*)
+            FROM {table}
+            GROUP BY tanggal::date, {column_list}
+            """)
+
+
+def downgrade() -> None:
+    for table in SUMMARY_COLUMNS:
+        op.drop_table(f"{table}_summary")
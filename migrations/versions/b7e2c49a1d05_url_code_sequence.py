@@ -0,0 +1,28 @@
+"""url code sequence
+
+Revision ID: b7e2c49a1d05
+Revises: 8f41b2d7c630
+Create Date: 2026-10-17 16:20:00.000000
+
+Sequence that short codes are derived from (see main/core/short_codes.py).
+New codes are 7 characters, so they cannot collide with the existing
+6-character random ones.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2c49a1d05"
+down_revision: Union[str, None] = "8f41b2d7c630"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS rec_shorten_urls_code_seq")
+
+
+def downgrade() -> None:
+    op.execute("DROP SEQUENCE IF EXISTS rec_shorten_urls_code_seq")
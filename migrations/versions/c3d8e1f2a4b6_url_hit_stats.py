@@ -0,0 +1,33 @@
+"""url hit stats
+
+Revision ID: c3d8e1f2a4b6
+Revises: b7e2c49a1d05
+Create Date: 2026-10-17 16:45:00.000000
+
+Redirect counts per short code, written in batches by main/core/url_stats.py.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d8e1f2a4b6"
+down_revision: Union[str, None] = "b7e2c49a1d05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rec_shorten_url_stats",
+        sa.Column("url_code", sa.String(), nullable=False),
+        sa.Column("hits", sa.BigInteger(), nullable=False),
+        sa.Column("last_accessed", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("url_code"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rec_shorten_url_stats")
@@ -0,0 +1,207 @@
+"""absen monthly partitions
+
+Revision ID: d4f7a9b3c2e1
+Revises: c3d8e1f2a4b6
+Create Date: 2026-10-17 19:20:00.000000
+
+Turn rec_absen_pengajian and rec_absen_asramaan into tables range
+partitioned by month on tanggal, so the dedup check and date filters only
+touch the partitions for the months involved.
+
+- absen_create_partition(parent, month) creates one month's partition with
+  its dedup exclusion constraint, moving in any rows for that month that had
+  landed in the default partition. The migration creates a partition for
+  every month that has data plus the current and next month;
+  main/core/partitions.py keeps creating them ahead of time.
+- {table}_default catches rows for months without a partition, e.g. old
+  dates entered by hand, so such inserts never fail.
+- Exclusion constraints cannot span partitions, so each partition has its
+  own. A check-in within 2 hours of a month boundary can clash with a row in
+  the neighbouring month; the absen_dedup_across_months trigger checks those
+  rows (serialized per table with an advisory lock) and skips the insert like
+  ON CONFLICT DO NOTHING would.
+- The primary key has to include the partition key and becomes (id, tanggal).
+  ids still come from the same sequence.
+
+The data is copied in one transaction, with both tables locked meanwhile.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f7a9b3c2e1"
+down_revision: Union[str, None] = "c3d8e1f2a4b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEDUP_COLUMNS = {
+    "rec_absen_pengajian": ["acara", "nama", "lokasi", "ranah", "detail_ranah"],
+    "rec_absen_asramaan": ["acara", "nama", "lokasi", "ranah", "detail_ranah", "sesi"],
+}
+
+INDEXED_COLUMNS = {
+    "rec_absen_pengajian": ["acara", "nama"],
+    "rec_absen_asramaan": ["acara", "nama", "sesi"],
+}
+
+WINDOW = "tsrange(tanggal - interval '1 hour', tanggal + interval '1 hour', '[]')"
+
+
+def _dedup_constraint(columns: Sequence[str]) -> str:
+    elements = ", ".join(f"{c} WITH =" for c in columns)
+    return f"EXCLUDE USING gist ({elements}, {WINDOW} WITH &&)"
+
+
+def _create_functions() -> None:
+    cases = []
+    for table, columns in DEDUP_COLUMNS.items():
+        quoted = _dedup_constraint(columns).replace("'", "''")
+        cases.append(f"WHEN '{table}' THEN '{quoted}'")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION absen_create_partition(parent text, month date)
+        RETURNS boolean
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            start_at timestamp := date_trunc('month', month);
+            end_at timestamp := date_trunc('month', month) + interval '1 month';
+            child text := parent || '_p' || to_char(month, 'YYYY_MM');
+            dedup text := CASE parent {' '.join(cases)} END;
+        BEGIN
+            IF dedup IS NULL THEN
+                RAISE EXCEPTION 'no partition layout for table %', parent;
+            END IF;
+            IF to_regclass(child) IS NOT NULL THEN
+                RETURN false;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', child, parent);
+            -- Rows for this month inserted before the partition existed
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE tanggal >= $1 AND tanggal < $2 RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                parent || '_default', child
+            ) USING start_at, end_at;
+            EXECUTE format(
+                'ALTER TABLE %I ADD CONSTRAINT %I %s',
+                child, 'ex_' || child || '_dedup', dedup
+            );
+            EXECUTE format(
+                'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                parent, child, start_at, end_at
+            );
+            RETURN true;
+        END
+        $$
+        """)
+
+    # TG_ARGV: the partitioned table, then its dedup columns
+    op.execute("""
+        CREATE OR REPLACE FUNCTION absen_dedup_across_months()
+        RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start timestamp := date_trunc('month', NEW.tanggal);
+            matches text;
+            clash boolean;
+        BEGIN
+            -- Away from a month boundary the partition's own constraint is enough
+            IF NEW.tanggal >= month_start + interval '2 hours'
+               AND NEW.tanggal < month_start + interval '1 month' - interval '2 hours' THEN
+                RETURN NEW;
+            END IF;
+
+            -- Serializes boundary inserts so two sides of a clash can't both pass
+            PERFORM pg_advisory_xact_lock(hashtext(TG_ARGV[0]));
+            SELECT string_agg(format('%1$I = ($1).%1$I', c), ' AND ')
+            INTO matches
+            FROM unnest(TG_ARGV[1:]) AS c;
+            EXECUTE format(
+                'SELECT EXISTS (SELECT 1 FROM %I WHERE %s '
+                'AND tanggal BETWEEN ($1).tanggal - interval ''2 hours'' '
+                'AND ($1).tanggal + interval ''2 hours'')',
+                TG_ARGV[0], matches
+            ) INTO clash USING NEW;
+            IF clash THEN
+                RETURN NULL;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+        """)
+
+
+def upgrade() -> None:
+    _create_functions()
+
+    for table, columns in DEDUP_COLUMNS.items():
+        old = f"{table}_unpartitioned"
+        # Keep the id sequence when the old table is dropped
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        op.execute(f"LOCK TABLE {old} IN EXCLUSIVE MODE")
+
+        op.execute(f"""
+            CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)
+            PARTITION BY RANGE (tanggal)
+            """)
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        op.execute(f"""
+            ALTER TABLE {table}_default
+            ADD CONSTRAINT ex_{table}_default_dedup {_dedup_constraint(columns)}
+            """)
+        op.execute(f"""
+            SELECT absen_create_partition('{table}', month::date)
+            FROM (
+                SELECT DISTINCT date_trunc('month', tanggal) FROM {old}
+                UNION
+                SELECT date_trunc('month', now())
+                UNION
+                SELECT date_trunc('month', now()) + interval '1 month'
+            ) AS months (month)
+            ORDER BY month
+            """)
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+        # Built once over the loaded data; partitions created later get them
+        # from the parent
+        op.create_primary_key(f"{table}_pkey", table, ["id", "tanggal"])
+        for column in INDEXED_COLUMNS[table]:
+            op.create_index(f"ix_{table}_{column}", table, [column])
+        op.create_index(f"ix_{table}_tanggal_id", table, ["tanggal", "id"])
+
+        arguments = ", ".join(f"'{c}'" for c in [table, *columns])
+        op.execute(f"""
+            CREATE TRIGGER {table}_dedup_across_months
+            BEFORE INSERT ON {table}
+            FOR EACH ROW EXECUTE FUNCTION absen_dedup_across_months({arguments})
+            """)
+
+
+def downgrade() -> None:
+    # Partitions already detached into the archive schema are left there
+    for table, columns in DEDUP_COLUMNS.items():
+        old = f"{table}_partitioned"
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+        op.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        op.execute(f"LOCK TABLE {old} IN EXCLUSIVE MODE")
+
+        op.execute(f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        op.execute(f"DROP TABLE {old}")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+        op.create_primary_key(f"{table}_pkey", table, ["id"])
+        for column in INDEXED_COLUMNS[table]:
+            op.create_index(f"ix_{table}_{column}", table, [column])
+        op.create_index(f"ix_{table}_tanggal_id", table, ["tanggal", "id"])
+        op.execute(f"""
+            ALTER TABLE {table}
+            ADD CONSTRAINT ex_{table}_dedup {_dedup_constraint(columns)}
+            """)
+
+    op.execute("DROP FUNCTION absen_dedup_across_months()")
+    op.execute("DROP FUNCTION absen_create_partition(text, date)")
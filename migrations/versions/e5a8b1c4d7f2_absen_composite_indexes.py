@@ -0,0 +1,65 @@
+"""absen composite indexes
+
+Revision ID: e5a8b1c4d7f2
+Revises: d4f7a9b3c2e1
+Create Date: 2026-10-17 20:30:00.000000
+
+Indexes shaped like the list queries instead of one per column: with
+(acara|lokasi|sesi, tanggal, id), an equality filter plus the day range is
+one index range scan already in keyset order, and with id in the key the
+count=exact query is answered from the index alone.
+
+The single-column acara and sesi indexes are prefixes of these and are
+dropped. So is the one on nama: the only lookups by nama are the dedup
+checks, which the partitions' exclusion constraint indexes serve.
+support/explain_check.py verifies the plans.
+
+The planner only picks the composite indexes for an acara or sesi filter
+when random_page_cost is lowered for SSD storage. With Postgres' default of
+4, acara's poor correlation with tanggal makes them look more expensive than
+the (tanggal, id) index plus a filter, although they read about a third of
+the rows. The app does not override planner costs. Set it on the server or
+the role, which also covers connections through pgbouncer:
+
+    ALTER ROLE besb_user SET random_page_cost = 1.1;
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a8b1c4d7f2"
+down_revision: Union[str, None] = "d4f7a9b3c2e1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FILTER_COLUMNS = {
+    "rec_absen_pengajian": ["acara", "lokasi"],
+    "rec_absen_asramaan": ["acara", "lokasi", "sesi"],
+}
+
+SINGLE_COLUMN_INDEXES = {
+    "rec_absen_pengajian": ["acara", "nama"],
+    "rec_absen_asramaan": ["acara", "nama", "sesi"],
+}
+
+
+def upgrade() -> None:
+    for table, columns in FILTER_COLUMNS.items():
+        for column in columns:
+            op.create_index(
+                f"ix_{table}_{column}_tanggal_id", table, [column, "tanggal", "id"]
+            )
+
+        for column in SINGLE_COLUMN_INDEXES[table]:
+            op.drop_index(f"ix_{table}_{column}", table_name=table)
+
+
+def downgrade() -> None:
+    for table, columns in FILTER_COLUMNS.items():
+        for column in SINGLE_COLUMN_INDEXES[table]:
+            op.create_index(f"ix_{table}_{column}", table, [column])
+
+        for column in columns:
+            op.drop_index(f"ix_{table}_{column}_tanggal_id", table_name=table)
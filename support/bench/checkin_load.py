@@ -0,0 +1,162 @@
+"""
+Load benchmark for attendance check-in bursts.
+
+Fires concurrent POST /absen-pengajian/ (or /absen-asramaan/) requests while a
+background reader keeps hitting the list endpoint, then reports latency
+percentiles for both. Run it once against the old build and once against the
+new one with the same arguments to compare p99 under burst load.
+
+Example:
+    python support/bench/checkin_load.py \\
+        --base-url http://127.0.0.1:8000 \\
+        --authorization "ApiKey <key>" \\
+        --requests 2000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import urllib.parse
+import uuid
+from datetime import date
+from typing import Dict, List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label: str, samples: List[float], statuses: Dict[int, int]) -> None:
+    if not samples:
+        print(f"{label}: no samples")
+        return
+    print(
+        f"{label}: n={len(samples)} "
+        f"mean={statistics.mean(samples):.1f}ms "
+        f"p50={percentile(samples, 50):.1f}ms "
+        f"p95={percentile(samples, 95):.1f}ms "
+        f"p99={percentile(samples, 99):.1f}ms "
+        f"max={max(samples):.1f}ms "
+        f"statuses={dict(sorted(statuses.items()))}"
+    )
+
+
+def build_form(args: argparse.Namespace, seq: int) -> Dict[str, str]:
+    form = {
+        "acara": args.acara,
+        "tanggal": date.today().isoformat(),
+        "jam_hadir": time.strftime("%H:%M"),
+        # Unique names so the duplicate check never short-circuits the insert
+        "nama": f"bench-{uuid.uuid4().hex[:12]}-{seq}",
+        "lokasi": args.lokasi,
+        "ranah": "bench",
+        "detail_ranah": "bench",
+    }
+    if args.endpoint == "absen-asramaan":
+        form["sesi"] = args.sesi
+    return form
+
+
+async def run_writers(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    samples: List[float],
+    statuses: Dict[int, int],
+) -> None:
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(seq: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                f"/{args.endpoint}/", data=build_form(args, seq)
+            )
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(one(seq) for seq in range(args.requests)))
+
+
+async def run_reader(
+    client: httpx.AsyncClient,
+    args: argparse.Namespace,
+    stop: asyncio.Event,
+    samples: List[float],
+    statuses: Dict[int, int],
+) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(f"/{args.endpoint}/", params=args.list_params)
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency + args.readers)
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        headers={"Authorization": args.authorization},
+        limits=limits,
+        timeout=args.timeout,
+    ) as client:
+        write_samples: List[float] = []
+        write_statuses: Dict[int, int] = {}
+        read_samples: List[float] = []
+        read_statuses: Dict[int, int] = {}
+
+        stop = asyncio.Event()
+        readers = [
+            asyncio.create_task(
+                run_reader(client, args, stop, read_samples, read_statuses)
+            )
+            for _ in range(args.readers)
+        ]
+
+        started = time.perf_counter()
+        await run_writers(client, args, write_samples, write_statuses)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*readers)
+
+    print(f"endpoint=/{args.endpoint}/ elapsed={elapsed:.2f}s")
+    print(f"throughput={args.requests / elapsed:.1f} check-ins/s")
+    report("check-in", write_samples, write_statuses)
+    report("list", read_samples, read_statuses)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--authorization", required=True)
+    parser.add_argument(
+        "--endpoint",
+        choices=["absen-pengajian", "absen-asramaan"],
+        default="absen-pengajian",
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--readers",
+        type=int,
+        default=2,
+        help="Concurrent list_absen scans running during the burst",
+    )
+    parser.add_argument(
+        "--list-query",
+        default="",
+        help="Query string for the background scans, e.g. 'acara=seed&lokasi=x'",
+    )
+    parser.add_argument("--acara", default="bench")
+    parser.add_argument("--lokasi", default="bench")
+    parser.add_argument("--sesi", default="bench")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    arguments = parser.parse_args()
+    arguments.list_params = dict(urllib.parse.parse_qsl(arguments.list_query))
+    asyncio.run(main(arguments))
@@ -0,0 +1,81 @@
+"""
+Cold-start benchmark for an API worker.
+
+Starts a fresh interpreter per run and times, in order, the third-party
+imports, each app subsystem's import, Django/auth initialization and the
+final `import main`. Subsystems imported earlier make later steps cheaper,
+so the numbers are what each step adds on top of the previous ones. Nothing
+here connects to Postgres or Redis.
+
+Example:
+    python support/bench/startup_time.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+MAIN_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "main"
+)
+
+# Run inside each child interpreter; prints {step: seconds} as JSON
+CHILD = """
+import importlib, json, time
+timings = {}
+
+def step(name, action):
+    start = time.perf_counter()
+    action()
+    timings[name] = time.perf_counter() - start
+
+for name, modules in [
+    ("fastapi", ["fastapi"]),
+    ("sqlalchemy", ["sqlalchemy", "sqlmodel", "asyncpg", "psycopg2"]),
+    ("redis", ["redis.asyncio", "fastapi_limiter"]),
+    ("prometheus", ["prometheus_client"]),
+    ("core.db", ["core.db"]),
+    ("core.auth", ["core.auth"]),
+]:
+    step(name, lambda: [importlib.import_module(m) for m in modules])
+
+step("init_auth", lambda: importlib.import_module("core.auth").init_auth())
+step("endpoints", lambda: importlib.import_module("endpoints"))
+step("main", lambda: importlib.import_module("main"))
+print(json.dumps(timings))
+"""
+
+
+def run_once() -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=MAIN_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(args: argparse.Namespace) -> None:
+    runs: List[Dict[str, float]] = [run_once() for _ in range(args.runs)]
+    steps = list(runs[0])
+    print(f"runs={args.runs}")
+    for name in steps + ["total"]:
+        samples = [
+            (sum(run.values()) if name == "total" else run[name]) * 1000 for run in runs
+        ]
+        print(
+            f"{name:>12}: median={statistics.median(samples):7.1f}ms "
+            f"min={min(samples):7.1f}ms max={max(samples):7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,131 @@
+"""
+Per-query latency with and without asyncpg prepared-statement caching.
+
+Runs the hot query shapes (short-code lookup, sesi and daerah lookups, the
+check-in insert with its dedup constraint, a keyset page) over one
+connection per configuration and prints mean/p50/p99 per shape. Between hot
+queries it can run --churn other distinct statements, like the one-off
+multi-row inserts and IN lists real traffic mixes in, which is what evicts
+hot statements from a small cache.
+
+Uses the same POSTGRES_* settings as the app. Inserts are rolled back.
+
+Example:
+    python support/bench/statement_cache.py --iterations 2000 --churn 150
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "main")
+)
+
+from sqlalchemy import literal_column, select  # noqa: E402
+from sqlalchemy.dialects.postgresql import insert as pg_insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine  # noqa: E402
+
+from core.db import ASYNC_DATABASE_URL, STATEMENT_CACHE_SIZE  # noqa: E402
+from schema.absen_pengajian_schema import AbsenPengajian  # noqa: E402
+from schema.data_daerah_schema import DataDaerah  # noqa: E402
+from schema.sesi_schema import Sesi  # noqa: E402
+from schema.url_schema import URL  # noqa: E402
+
+CONFIGURATIONS: Dict[str, Dict[str, Any]] = {
+    "no cache (pgbouncer mode)": {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    },
+    "asyncpg default (100)": {},
+    f"configured ({STATEMENT_CACHE_SIZE})": {
+        "statement_cache_size": STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": STATEMENT_CACHE_SIZE,
+    },
+}
+
+
+def shapes() -> Dict[str, Callable[[int], Any]]:
+    now = datetime.now()
+    return {
+        "url by code": lambda i: select(URL.url).where(URL.url_code == f"bench{i}"),
+        "sesi by acara": lambda i: select(Sesi).where(Sesi.acara == "bench"),
+        "daerah by name": lambda i: select(DataDaerah).where(
+            DataDaerah.daerah == "bench"
+        ),
+        "check-in insert": lambda i: pg_insert(AbsenPengajian)
+        .values(
+            acara="bench",
+            tanggal=now,
+            jam_hadir="08:00",
+            nama=f"bench-{i}",
+            lokasi="bench",
+            ranah="bench",
+            detail_ranah="bench",
+        )
+        .on_conflict_do_nothing(),
+        "keyset page": lambda i: select(AbsenPengajian)
+        .where(AbsenPengajian.tanggal >= now)
+        .order_by(AbsenPengajian.tanggal, AbsenPengajian.id)
+        .limit(50),
+    }
+
+
+def churn_statement(n: int) -> Any:
+    # Different SQL text, so a different entry in the statement cache
+    return select(literal_column(str(n)).label(f"churn_{n}"))
+
+
+async def measure(
+    conn: AsyncConnection, build: Callable[[int], Any], args: argparse.Namespace
+) -> List[float]:
+    samples = []
+    for i in range(args.iterations):
+        for n in range(args.churn):
+            await conn.execute(churn_statement((i * args.churn + n) % 1000))
+        statement = build(i)
+        start = time.perf_counter()
+        await conn.execute(statement)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def report(name: str, samples: List[float]) -> None:
+    ordered = sorted(samples)
+    print(
+        f"  {name:<16} mean={statistics.mean(samples):8.1f}us "
+        f"p50={ordered[len(ordered) // 2]:8.1f}us "
+        f"p99={ordered[int(len(ordered) * 0.99)]:8.1f}us"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    for label, connect_args in CONFIGURATIONS.items():
+        engine = create_async_engine(
+            ASYNC_DATABASE_URL, pool_size=1, connect_args=connect_args
+        )
+        print(label)
+        async with engine.connect() as conn:
+            for name, build in shapes().items():
+                # Warm up the connection and SQLAlchemy's compiled cache
+                await conn.execute(build(-1))
+                report(name, await measure(conn, build, args))
+            await conn.rollback()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument(
+        "--churn",
+        type=int,
+        default=0,
+        help="Distinct other statements run before each measured query",
+    )
+    asyncio.run(main(parser.parse_args()))
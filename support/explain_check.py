@@ -0,0 +1,257 @@
+"""
+Fail when a hot attendance query is not served by an index of its shape.
+
+Seeds --rows-per-month check-ins into each of the current and next month's
+partitions of both attendance tables, ANALYZEs every partition, and runs
+EXPLAIN ANALYZE on the list (each filter, with and
+without a cursor), exact count, get-by-id and cross-month dedup queries. A
+query fails when it
+- plans a Seq Scan on a table or partition with at least --min-rows rows
+  (tiny partitions are left to the planner), or
+- reads more than --max-removed rows that a filter then throws away, which
+  is what an index on the wrong columns looks like.
+Everything, including the seeded rows and the statistics, is rolled back at
+the end.
+
+Plans are checked with random_page_cost set to --random-page-cost (1.1, the
+SSD value the composite indexes need; see the absen_composite_indexes
+migration). The script reports when the server's own value differs, since
+the app then gets other plans; pass that value to check them instead.
+
+Uses the same POSTGRES_* settings as the app, against a database migrated to
+head. Exits 1 when a query fails the check.
+
+Example:
+    python support/explain_check.py --rows-per-month 50000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple, Type
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "main"))
+
+from sqlalchemy import func, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection  # noqa: E402
+from sqlmodel import SQLModel  # noqa: E402
+
+from core.db import POSTGRES_USER, async_engine  # noqa: E402
+from core.pagination import encode_cursor, explain, page_query  # noqa: E402
+from endpoints import absen_asramaan, absen_pengajian  # noqa: E402
+from schema.absen_asramaan_schema import AbsenAsramaan  # noqa: E402
+from schema.absen_pengajian_schema import AbsenPengajian  # noqa: E402
+
+PAGE_SIZE = 51
+
+# :rows check-ins evenly over each of the two months, so both partitions get
+# the same amount. nama repeats only every 1000 rows (hours apart even at
+# 100k rows a month), so the seed never trips the dedup constraint.
+SEED = """
+    INSERT INTO {table} (acara, tanggal, jam_hadir, nama, lokasi, ranah,
+                         detail_ranah, {extra_columns} created_at)
+    SELECT 'acara-' || i % 20,
+           at,
+           to_char(at, 'HH24:MI'),
+           'nama-' || i % 1000,
+           'lokasi-' || i % 50,
+           'ranah-' || i % 5,
+           'detail-' || i % 10,
+           {extra_values}
+           now()
+    FROM generate_series(0, 1) AS month,
+         generate_series(1, :rows) AS i,
+         LATERAL (
+             SELECT date_trunc('month', now()) + month * interval '1 month' AS start_at
+         ) AS m,
+         LATERAL (
+             SELECT start_at + (i - 1) * (start_at + interval '1 month' - start_at) / :rows
+             AS at
+         ) AS t
+    """
+
+
+async def seed(conn: AsyncConnection, model: Type[SQLModel], rows: int) -> None:
+    asramaan = model is AbsenAsramaan
+    table = model.__tablename__
+    await conn.execute(
+        text(
+            SEED.format(
+                table=table,
+                extra_columns="sesi," if asramaan else "",
+                extra_values="'sesi-' || i % 8," if asramaan else "",
+            )
+        ),
+        {"rows": rows},
+    )
+    # Every partition explicitly, so each has fresh statistics for its own
+    # plan, not only what the parent's sample happened to pick up
+    partitions = await conn.scalars(
+        text("""
+            SELECT inhrelid::regclass::text FROM pg_inherits
+            WHERE inhparent = CAST(:table AS regclass)
+            """),
+        {"table": table},
+    )
+    for partition in [table, *partitions]:
+        await conn.execute(text(f'ANALYZE "{partition}"'))
+
+
+def shapes(model: Type[SQLModel]) -> Dict[str, Any]:
+    """The queries the endpoints run, keyed by a readable name"""
+    day = datetime.now().replace(day=10).strftime("%Y-%m-%d")
+    day_start = datetime.strptime(day, "%Y-%m-%d")
+    columns = list(model.model_fields)
+    asramaan = model is AbsenAsramaan
+
+    def filters(**given: str) -> List[Any]:
+        if asramaan:
+            return absen_asramaan.absen_filters(
+                given.get("tanggal"),
+                given.get("acara"),
+                given.get("sesi"),
+                given.get("lokasi"),
+            )
+        return absen_pengajian.absen_filters(
+            given.get("tanggal"), given.get("acara"), given.get("lokasi")
+        )
+
+    def page(cursor: bool = False, **given: str) -> Any:
+        after = encode_cursor(day_start, 0) if cursor else None
+        return page_query(model, columns, filters(**given), PAGE_SIZE, after)
+
+    by_acara = filters(acara="acara-3")
+    # The absen_dedup_across_months lookup: the full dedup key of seeded row
+    # 7 and a 4 hour window across the end of the current month
+    month_end = (day_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    seeded = {
+        "acara": "acara-7",
+        "nama": "nama-7",
+        "lokasi": "lokasi-7",
+        "ranah": "ranah-2",
+        "detail_ranah": "detail-7",
+        "sesi": "sesi-7",
+    }
+    dedup_fields = (absen_asramaan if asramaan else absen_pengajian).DEDUP_FIELDS
+    queries = {
+        "list": page(),
+        "list by day": page(tanggal=day),
+        "list by acara": page(acara="acara-3"),
+        "list by acara and day": page(acara="acara-3", tanggal=day),
+        "list by lokasi and day": page(lokasi="lokasi-7", tanggal=day),
+        "next page by acara": page(cursor=True, acara="acara-3"),
+        "exact count by acara": select(func.count()).select_from(
+            select(getattr(model, "id")).where(*by_acara).subquery()
+        ),
+        "get by id": select(model).where(getattr(model, "id") == 1),
+        "cross-month dedup": select(getattr(model, "id")).where(
+            *[getattr(model, field) == seeded[field] for field in dedup_fields],
+            getattr(model, "tanggal").between(
+                month_end - timedelta(hours=2), month_end + timedelta(hours=2)
+            ),
+        ),
+    }
+    if asramaan:
+        queries["list by sesi"] = page(sesi="sesi-2")
+        queries["list by acara, sesi and day"] = page(
+            acara="acara-3", sesi="sesi-3", tanggal=day
+        )
+    return queries
+
+
+def plan_nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+async def check(
+    conn: AsyncConnection, query: Any, args: argparse.Namespace
+) -> Tuple[bool, str]:
+    plan = (await conn.execute(explain(query, analyze=True))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes = plan_nodes(plan[0]["Plan"])
+
+    scanned = sorted(
+        {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+    )
+    too_big = []
+    for relation in scanned:
+        rows = await conn.scalar(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": relation},
+        )
+        if rows >= args.min_rows:
+            too_big.append(f"{relation} ({int(rows)} rows)")
+    # Per-loop figures, like the row counts
+    removed = sum(
+        node.get("Rows Removed by Filter", 0) * node.get("Actual Loops", 1)
+        for node in nodes
+    )
+
+    indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+    if too_big:
+        return False, f"Seq Scan on {', '.join(too_big)}"
+    if removed > args.max_removed:
+        return False, f"{removed:.0f} rows removed by filter using {', '.join(indexes)}"
+    return True, ", ".join(indexes) or "no index needed"
+
+
+async def main(args: argparse.Namespace) -> int:
+    failures = 0
+    async with async_engine.connect() as conn:
+        await conn.begin()
+        # Seeding a large --rows-per-month takes longer than the app's limit
+        await conn.execute(text("SET LOCAL statement_timeout = 0"))
+        server_cost = float(await conn.scalar(text("SHOW random_page_cost")))
+        if server_cost != args.random_page_cost:
+            print(
+                f"NOTE server random_page_cost is {server_cost:g}, plans are checked"
+                f" with {args.random_page_cost:g}: set it on the role, e.g."
+                f" ALTER ROLE {POSTGRES_USER} SET random_page_cost ="
+                f" {args.random_page_cost:g}"
+            )
+        await conn.execute(
+            text(f"SET LOCAL random_page_cost = {args.random_page_cost}")
+        )
+        try:
+            for model in [AbsenPengajian, AbsenAsramaan]:
+                await seed(conn, model, args.rows_per_month)
+                print(model.__tablename__)
+                for name, query in shapes(model).items():
+                    ok, detail = await check(conn, query, args)
+                    failures += not ok
+                    print(f"  {'ok  ' if ok else 'FAIL'} {name:<28} {detail}")
+        finally:
+            await conn.rollback()
+    await async_engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows-per-month", type=int, default=50000)
+    parser.add_argument(
+        "--random-page-cost",
+        type=float,
+        default=1.1,
+        help="Planner setting the plans are checked with",
+    )
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=1000,
+        help="Sequential scans of smaller tables and partitions are allowed",
+    )
+    parser.add_argument(
+        "--max-removed",
+        type=int,
+        default=200,
+        help="Rows a query may read and then discard with a filter",
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,54 @@
+"""
+Production server settings: gunicorn managing uvicorn workers.
+
+Started by support/gunicorn.sh. Every setting can be overridden from the
+environment, e.g. WEB_CONCURRENCY=8 for the worker count.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# The app is async, so one worker per CPU the container may use is enough
+workers = int(os.getenv("WEB_CONCURRENCY", str(len(os.sched_getaffinity(0)))))
+# Picks uvloop and httptools when installed (uvicorn[standard])
+worker_class = "uvicorn.workers.UvicornWorker"
+worker_tmp_dir = "/dev/shm"
+
+# Pending connections the kernel queues while every worker is busy
+backlog = int(os.getenv("GUNICORN_BACKLOG", "2048"))
+# Longer than nginx keeps idle upstream connections, so nginx closes first
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "75"))
+
+# Recycle workers now and then to cap slow memory growth; the jitter stops
+# them from all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
+
+# A worker silent for this long is killed and replaced
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On SIGTERM/SIGHUP workers get this long to finish in-flight requests and run
+# the lifespan shutdown (final hit-count flush etc.)
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+accesslog = "-"
+errorlog = "-"
+# Only trust X-Forwarded-* from the local nginx
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    for module in ("uvloop", "httptools"):
+        try:
+            __import__(module)
+        except ImportError:
+            server.log.warning(f"{module} is not installed; using the slower default")
+
+
+def child_exit(server, worker):
+    # Also covers workers that crash before their lifespan shutdown runs
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,11 @@
+#!/bin/bash
+# Production launcher; support/uvicorn.sh is the auto-reloading development one
+source /app/support/venv/bin/activate
+cd /app/main
+
+# Workers write Prometheus samples here; clear out the previous run's files
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+exec gunicorn main:app --config /app/support/gunicorn.conf.py
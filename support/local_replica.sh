@@ -0,0 +1,24 @@
+#!/bin/bash
+# Start a streaming replica of a local Postgres on another port, for trying
+# out read-replica routing. The primary must allow replication connections
+# from localhost (pg_hba.conf) for REPLICA_USER. Then run the API with e.g.
+#   POSTGRES_REPLICA_URLS=postgresql://besb_user:<password>@127.0.0.1:5433/besb_db
+# Stop it with: pg_ctl -D "$REPLICA_DIR" stop
+set -e
+
+PRIMARY_HOST=${PRIMARY_HOST:-127.0.0.1}
+PRIMARY_PORT=${PRIMARY_PORT:-5432}
+REPLICA_USER=${REPLICA_USER:-postgres}
+REPLICA_PORT=${REPLICA_PORT:-5433}
+REPLICA_DIR=${REPLICA_DIR:-/tmp/besb-replica}
+
+if [ -e "$REPLICA_DIR" ]; then
+    echo "$REPLICA_DIR already exists; remove it first for a fresh copy"
+    exit 1
+fi
+
+# -R writes standby.signal and primary_conninfo, so it starts as a standby
+pg_basebackup -h "$PRIMARY_HOST" -p "$PRIMARY_PORT" -U "$REPLICA_USER" \
+    -D "$REPLICA_DIR" -R -X stream
+echo "port = $REPLICA_PORT" >> "$REPLICA_DIR/postgresql.auto.conf"
+pg_ctl -D "$REPLICA_DIR" -l "$REPLICA_DIR/replica.log" start -w
@@ -1,13 +1,19 @@
 #!/bin/bash
+# Development only: reloads on code changes, which also means a single
+# worker. Production runs support/gunicorn.sh.
 source /app/support/venv/bin/activate
 cd /app/main
 
+# Workers write Prometheus samples here; clear out the previous run's files
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Run uvicorn with enhanced verbose logging
 exec uvicorn main:app \
     --reload \
     --host 0.0.0.0 \
     --port 8000 \
-    --workers 4 \
     --log-level debug \
     --use-colors \
     --reload-dir /app/main \